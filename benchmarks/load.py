@@ -0,0 +1,389 @@
+"""Load test of the public API with saved baselines.
+
+Start a disposable stack, seed it, then drive it and save or compare a baseline:
+
+    docker compose -f compose.dev.yaml -f benchmarks/compose.yaml up -d --build
+    POSTGRES_HOST=localhost POSTGRES_PASSWORD=password PYTHONPATH=src python -m benchmarks.load seed
+    PYTHONPATH=src python -m benchmarks.load run --save-baseline local
+    PYTHONPATH=src python -m benchmarks.load run --compare local
+
+``seed`` works against any PostgreSQL the migrations have been applied to (e.g. by starting the app once)
+and reads the same ``POSTGRES_*`` variables as the app. Seeding is deterministic and idempotent, so
+re-running it with the same arguments leaves the data unchanged.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Self
+from uuid import UUID
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from pulse_backend.crypt import hash_password
+from pulse_backend.database import DatabaseSettings
+from pulse_backend.db_models import Country, Friend, Post, Session, User
+
+BASELINES = Path(__file__).parent / "baselines"
+PASSWORD = "Bench1234"  # noqa: S105
+TAGS = [f"tag{i}" for i in range(50)]
+CHUNK = 5000
+# Post content is drawn from common English words and a long tail of rarer terms, with Zipf-like
+# frequencies, so that full-text search sees both very common and very selective words.
+COMMON_WORDS = """
+time people year way day thing man world life hand part child eye woman place work week case point
+government company number group problem fact music coffee city train weather football movie book
+game party summer winter beach garden dinner morning night friend family photo travel holiday
+concert market news story picture birthday weekend
+"""
+WORDS = [
+    *COMMON_WORDS.split(),
+    *(f"term{i}" for i in range(5000)),
+]
+WORD_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+
+
+def login(index: int) -> str:
+    return f"bench-{index:07d}"
+
+
+def post_content(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, cum_weights=WORD_WEIGHTS, k=rng.randint(3, 30)))
+
+
+# Seeding
+
+
+async def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)  # noqa: S311
+    engine = create_async_engine(DatabaseSettings.from_env().url)
+    now = datetime.now(UTC)
+    try:
+        async with engine.begin() as conn:
+            country_code = await conn.scalar(select(Country.alpha2).where(Country.alpha2.is_not(None)).limit(1))
+            if country_code is None:
+                sys.exit("The countries table is empty")
+            hashed_password = hash_password(PASSWORD)
+            await _insert(
+                conn,
+                User,
+                (
+                    {
+                        "login": login(i),
+                        "email": f"{login(i)}@example.com",
+                        "hashed_password": hashed_password,
+                        "country_code": country_code,
+                        "is_public": rng.random() < args.public_ratio,
+                        "phone": None,
+                        "image": None,
+                    }
+                    for i in range(args.users)
+                ),
+            )
+            await _insert(
+                conn,
+                Friend,
+                (
+                    {
+                        "of_login": login(i),
+                        "login": login(friend),
+                        "addedAt": now - timedelta(seconds=rng.randrange(1_000_000)),
+                    }
+                    for i in range(args.users)
+                    for friend in rng.sample(range(args.users), min(args.friends, args.users))
+                    if friend != i
+                ),
+            )
+            await _insert(
+                conn,
+                Post,
+                (
+                    {
+                        "id": UUID(int=rng.getrandbits(128), version=4),
+                        "content": post_content(rng),
+                        "author": login(i),
+                        "tags": rng.sample(TAGS, rng.randint(0, 3)),
+                        "createdAt": now - timedelta(seconds=rng.randrange(30 * 86400)),
+                        "likesCount": 0,
+                        "dislikesCount": 0,
+                    }
+                    for i in range(args.users)
+                    for _ in range(args.posts)
+                ),
+            )
+            # Half of them expired, as left behind between two runs of the session reaper.
+            await _insert(
+                conn,
+                Session,
+                (
+                    {
+                        "id": UUID(int=rng.getrandbits(128), version=4),
+                        "exp": now + timedelta(hours=rng.choice((-1, 1)) * rng.uniform(0, 1)),
+                        "user_login": login(i),
+                    }
+                    for i in range(args.users)
+                    for _ in range(args.sessions)
+                ),
+            )
+    finally:
+        await engine.dispose()
+
+
+async def _insert(conn: AsyncConnection, model: type[Any], rows: Any) -> None:  # noqa: ANN401
+    started = time.perf_counter()
+    chunk: list[dict[str, Any]] = []
+    total = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK:
+            await conn.execute(pg_insert(model).on_conflict_do_nothing(), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        await conn.execute(pg_insert(model).on_conflict_do_nothing(), chunk)
+        total += len(chunk)
+    print(f"{model.__tablename__}: {total} rows in {time.perf_counter() - started:.1f}s")  # noqa: T201
+
+
+# Load
+
+
+@dataclass(slots=True)
+class Actor:
+    login: str
+    token: str
+    post_ids: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class Operation:
+    name: str
+    weight: int
+    expected: frozenset[int]
+    call: Callable[["Driver", Actor], Awaitable[httpx.Response]]
+
+
+@dataclass(slots=True)
+class OperationStats:
+    count: int
+    errors: int
+    rps: float
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class Driver:
+    """Issues the requests of the operations on behalf of an ``Actor``."""
+
+    def __init__(self: Self, client: httpx.AsyncClient, users: int, country_code: str, rng: random.Random) -> None:
+        self.client = client
+        self.users = users
+        self.country_code = country_code
+        self.rng = rng
+        self.registered = 0
+
+    def other(self: Self) -> str:
+        return login(self.rng.randrange(self.users))
+
+    def get(self: Self, actor: Actor, url: str, **params: Any) -> Awaitable[httpx.Response]:  # noqa: ANN401
+        return self.client.get(url, params=params, headers={"Authorization": f"Bearer {actor.token}"})
+
+    def post(self: Self, actor: Actor, url: str, data: dict[str, Any] | None = None) -> Awaitable[httpx.Response]:
+        return self.client.post(url, json=data, headers={"Authorization": f"Bearer {actor.token}"})
+
+    def post_id(self: Self, actor: Actor) -> str:
+        return self.rng.choice(actor.post_ids) if actor.post_ids else str(UUID(int=0))
+
+    async def create_post(self: Self, actor: Actor) -> httpx.Response:
+        response = await self.post(actor, "/api/posts/new", {"content": "Load test", "tags": self.rng.sample(TAGS, 2)})
+        if response.status_code == 200:  # noqa: PLR2004
+            actor.post_ids.append(response.json()["id"])
+        return response
+
+    async def register(self: Self, _: Actor) -> httpx.Response:
+        self.registered += 1
+        name = f"bench-new-{time.time_ns():x}-{self.registered}"
+        return await self.client.post(
+            "/api/auth/register",
+            json={
+                "login": name[:30],
+                "email": f"{name}@example.com",
+                "password": PASSWORD,
+                "countryCode": self.country_code,
+                "isPublic": True,
+            },
+        )
+
+    async def sign_in(self: Self, actor: Actor) -> httpx.Response:
+        return await self.client.post("/api/auth/sign-in", json={"login": actor.login, "password": PASSWORD})
+
+
+OK = frozenset({200})
+OPERATIONS = (
+    Operation("profile", 15, frozenset({200, 403}), lambda d, a: d.get(a, f"/api/profiles/{d.other()}")),
+    Operation("feed_my", 15, OK, lambda d, a: d.get(a, "/api/posts/feed/my", limit=10)),
+    Operation("feed_friends", 20, OK, lambda d, a: d.get(a, "/api/posts/friends-feed", limit=10)),
+    Operation("feed_user", 15, frozenset({200, 404}), lambda d, a: d.get(a, f"/api/posts/feed/{d.other()}", limit=10)),
+    Operation("friends", 10, OK, lambda d, a: d.get(a, "/api/friends", limit=10)),
+    Operation("post", 10, frozenset({200, 404}), lambda d, a: d.get(a, f"/api/posts/{d.post_id(a)}")),
+    Operation("post_create", 5, OK, Driver.create_post),
+    Operation("post_like", 5, frozenset({200, 404}), lambda d, a: d.post(a, f"/api/posts/{d.post_id(a)}/like")),
+    Operation("friend_add", 2, OK, lambda d, a: d.post(a, "/api/friends/add", {"login": d.other()})),
+    Operation("friend_remove", 1, OK, lambda d, a: d.post(a, "/api/friends/remove", {"login": d.other()})),
+    Operation("sign_in", 1, OK, Driver.sign_in),
+    Operation("register", 1, OK, Driver.register),
+)
+
+
+async def sign_in(client: httpx.AsyncClient, index: int) -> Actor:
+    response = await client.post("/api/auth/sign-in", json={"login": login(index), "password": PASSWORD})
+    response.raise_for_status()
+    actor = Actor(login=login(index), token=response.json()["token"])
+    posts = await client.get(
+        "/api/posts/feed/my", params={"limit": 50}, headers={"Authorization": f"Bearer {actor.token}"}
+    )
+    posts.raise_for_status()
+    actor.post_ids = [post["id"] for post in posts.json()]
+    return actor
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)  # noqa: S311
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        countries = await client.get("/api/countries")
+        countries.raise_for_status()
+
+        signing_in = asyncio.Semaphore(args.concurrency)
+
+        async def limited_sign_in(index: int) -> Actor:
+            async with signing_in:
+                return await sign_in(client, index)
+
+        actors = await asyncio.gather(*(limited_sign_in(i) for i in rng.sample(range(args.users), args.actors)))
+        driver = Driver(client, args.users, countries.json()[0]["alpha2"], rng)
+        latencies: dict[str, list[float]] = {operation.name: [] for operation in OPERATIONS}
+        errors = dict.fromkeys(latencies, 0)
+        weights = [operation.weight for operation in OPERATIONS]
+        measure_from = time.perf_counter() + args.warmup
+        deadline = measure_from + args.duration
+
+        async def worker() -> None:
+            while (now := time.perf_counter()) < deadline:
+                operation = rng.choices(OPERATIONS, weights)[0]
+                actor = rng.choice(actors)
+                try:
+                    response = await operation.call(driver, actor)
+                    failed = response.status_code not in operation.expected
+                except httpx.HTTPError:
+                    failed = True
+                if now >= measure_from:
+                    latencies[operation.name].append(time.perf_counter() - now)
+                    errors[operation.name] += failed
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    operations = {name: _stats(values, errors[name], args.duration) for name, values in latencies.items() if values}
+    total = _stats([value for values in latencies.values() for value in values], sum(errors.values()), args.duration)
+    config = {key: getattr(args, key) for key in ("users", "actors", "concurrency", "duration", "warmup", "seed")}
+    return {"config": config, "total": asdict(total), "operations": {k: asdict(v) for k, v in operations.items()}}
+
+
+def _stats(latencies: list[float], errors: int, duration: float) -> OperationStats:
+    latencies = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return latencies[max(math.ceil(q * len(latencies)) - 1, 0)] * 1000
+
+    return OperationStats(
+        count=len(latencies),
+        errors=errors,
+        rps=len(latencies) / duration,
+        mean=sum(latencies) / len(latencies) * 1000,
+        p50=percentile(0.5),
+        p95=percentile(0.95),
+        p99=percentile(0.99),
+    )
+
+
+def report(result: dict[str, Any]) -> None:
+    print(f"{'operation':<14}{'count':>8}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")  # noqa: T201
+    for name, stats in [*result["operations"].items(), ("total", result["total"])]:
+        print(  # noqa: T201
+            f"{name:<14}{stats['count']:>8}{stats['errors']:>8}{stats['rps']:>9.1f}"
+            f"{stats['p50']:>9.1f}{stats['p95']:>9.1f}{stats['p99']:>9.1f}"
+        )
+
+
+def compare(result: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return the regressions of ``result``: p95 latency or throughput worse than the baseline by over ``tolerance``."""
+    regressions = []
+    for name, stats in [*result["operations"].items(), ("total", result["total"])]:
+        base = baseline["total"] if name == "total" else baseline["operations"].get(name)
+        if base is None:
+            continue
+        if stats["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {stats['p95']:.1f} ms, baseline {base['p95']:.1f} ms")
+        if stats["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {stats['rps']:.1f} rps, baseline {base['rps']:.1f} rps")
+        if stats["errors"] / stats["count"] > base["errors"] / base["count"] + tolerance / 10:
+            regressions.append(f"{name}: {stats['errors']} errors of {stats['count']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000, help="seeded users")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="insert users, friends, posts and sessions")
+    seed_parser.add_argument("--friends", type=int, default=20, help="friends per user")
+    seed_parser.add_argument("--posts", type=int, default=20, help="posts per user")
+    seed_parser.add_argument("--sessions", type=int, default=2, help="sessions per user")
+    seed_parser.add_argument("--public-ratio", type=float, default=0.7, help="share of public profiles")
+
+    run_parser = commands.add_parser("run", help="drive the API and report latency and throughput")
+    run_parser.add_argument("--base-url", default="http://localhost:8080")
+    run_parser.add_argument("--actors", type=int, default=200, help="signed-in seeded users issuing requests")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+    run_parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=10, help="seconds before measuring")
+    run_parser.add_argument("--save-baseline", metavar="NAME", help=f"save the result to {BASELINES}/NAME.json")
+    run_parser.add_argument("--compare", metavar="NAME", help="fail on a regression against a saved baseline")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        asyncio.run(seed(args))
+        return
+
+    result = asyncio.run(run(args))
+    report(result)
+    if args.save_baseline:
+        BASELINES.mkdir(exist_ok=True)
+        (BASELINES / f"{args.save_baseline}.json").write_text(json.dumps(result, indent=2) + "\n")
+    if args.compare:
+        baseline = json.loads((BASELINES / f"{args.compare}.json").read_text())
+        if baseline["config"] != result["config"]:
+            print(f"Warning: baseline config {baseline['config']} differs from {result['config']}")  # noqa: T201
+        if regressions := compare(result, baseline, args.tolerance):
+            sys.exit("Regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Latency of full-text post search against a seeded database.
+
+Seed a million posts (10 000 users with 100 posts each), then time the search query for terms of
+decreasing frequency:
+
+    POSTGRES_HOST=localhost POSTGRES_PASSWORD=password PYTHONPATH=src python -m benchmarks.load seed --posts 100
+    POSTGRES_HOST=localhost POSTGRES_PASSWORD=password PYTHONPATH=src python -m benchmarks.search
+
+``--explain`` prints the plan that finds each query's matches, ``--ilike`` also times a sequential
+``content ILIKE`` scan for the same words, the cost the GIN index on ``post.search_vector`` avoids.
+"""
+
+import argparse
+import asyncio
+import math
+import time
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.load import login
+from pulse_backend.database import DatabaseSettings
+from pulse_backend.db_models import POST_SEARCH_CONFIG, Post
+from pulse_backend.pagination import SEARCH_KEYSET
+from pulse_backend.services import VisibilityService
+
+# From the most common word of the seeded vocabulary to terms a handful of posts contain.
+QUERIES = (
+    "time",
+    "coffee",
+    "term100",
+    "term4000",
+    '"summer beach"',
+    "football or concert",
+    "travel -holiday",
+)
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(DatabaseSettings.from_env().url)
+    try:
+        async with AsyncSession(engine) as session:
+            service = VisibilityService(session=session)
+            posts = await session.scalar(select(func.count()).select_from(Post))
+            print(f"{posts} posts, viewer {login(0)}, {args.repeat} runs per query, page of {args.limit}\n")  # noqa: T201
+            print(f"{'query':<24}{'matches':>10}{'first p50':>11}{'first p95':>11}{'next p50':>10}")  # noqa: T201
+            for query in QUERIES:
+                await _measure(session, service, query, args)
+            if args.ilike:
+                print(f"\n{'ILIKE':<24}{'matches':>10}{'p50 ms':>11}")  # noqa: T201
+                for word in ("coffee", "term100", "term4000"):
+                    await _measure_ilike(session, word, args.repeat)
+    finally:
+        await engine.dispose()
+
+
+async def _measure(session: AsyncSession, service: VisibilityService, query: str, args: argparse.Namespace) -> None:
+    matches = await session.scalar(
+        select(func.count()).where(
+            Post.search_vector.bool_op("@@")(func.websearch_to_tsquery(POST_SEARCH_CONFIG, query))
+        )
+    )
+    first: list[float] = []
+    following: list[float] = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        hits = await service.search_text(query, login(0), limit=args.limit)
+        first.append(time.perf_counter() - started)
+        if len(hits) == args.limit:
+            last, rank = hits[-1]
+            cursor = SEARCH_KEYSET.encode([rank, last.createdAt, last.id])
+            started = time.perf_counter()
+            await service.search_text(query, login(0), limit=args.limit, cursor=cursor)
+            following.append(time.perf_counter() - started)
+    print(  # noqa: T201
+        f"{query:<24}{matches:>10}{_percentile(first, 0.5):>11.1f}{_percentile(first, 0.95):>11.1f}"
+        f"{_percentile(following, 0.5):>10.1f}"
+    )
+    if args.explain:
+        plan = await session.execute(
+            text(
+                "EXPLAIN (ANALYZE, BUFFERS) SELECT id FROM post"
+                " WHERE search_vector @@ websearch_to_tsquery(CAST(:config AS regconfig), :q)"
+            ),
+            {"config": POST_SEARCH_CONFIG, "q": query},
+        )
+        print("\n".join(f"    {line}" for (line,) in plan))  # noqa: T201
+
+
+async def _measure_ilike(session: AsyncSession, word: str, repeat: int) -> None:
+    durations = []
+    matches = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        matches = await session.scalar(select(func.count()).where(Post.content.ilike(f"%{word}%"))) or 0
+        durations.append(time.perf_counter() - started)
+    print(f"{word:<24}{matches:>10}{_percentile(durations, 0.5):>11.1f}")  # noqa: T201
+
+
+def _percentile(durations: list[float], q: float) -> float:
+    if not durations:
+        return math.nan
+    durations = sorted(durations)
+    return durations[max(math.ceil(q * len(durations)) - 1, 0)] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--explain", action="store_true", help="print the plan of each query")
+    parser.add_argument("--ilike", action="store_true", help="also time a sequential ILIKE scan")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,39 @@
+"""Per-token CPU cost of the session token codecs.
+
+Usage: ``PYTHONPATH=src python benchmarks/token_codec.py [--number N]``
+"""
+
+import argparse
+import timeit
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from pulse_backend.sessions import CODECS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="tokens per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements, the best one is reported")
+    args = parser.parse_args()
+
+    claims = {"jti": str(uuid4()), "exp": (datetime.now(UTC) + timedelta(hours=1)).timestamp()}
+    results: dict[str, tuple[float, float]] = {}
+    for name, codec_factory in CODECS.items():
+        codec = codec_factory("benchmark-secret")
+        token = codec.encode(claims)
+        encode = min(timeit.repeat(lambda: codec.encode(claims), number=args.number, repeat=args.repeat))  # noqa: B023
+        decode = min(timeit.repeat(lambda: codec.decode(token), number=args.number, repeat=args.repeat))  # noqa: B023
+        results[name] = (encode / args.number * 1e6, decode / args.number * 1e6)
+
+    print(f"{'codec':<8}{'encode, us':>14}{'decode, us':>14}")  # noqa: T201
+    for name, (encode_us, decode_us) in results.items():
+        print(f"{name:<8}{encode_us:>14.2f}{decode_us:>14.2f}")  # noqa: T201
+    baseline = results["jose"][1]
+    for name, (_, decode_us) in results.items():
+        if name != "jose":
+            print(f"{name}: decode {baseline / decode_us:.1f}x faster than jose")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
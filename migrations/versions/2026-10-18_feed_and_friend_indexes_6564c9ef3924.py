@@ -0,0 +1,124 @@
+# type: ignore
+"""feed and friend indexes
+
+Revision ID: 6564c9ef3924
+Revises: e82228670d8a
+Create Date: 2026-10-18 09:12:41.502318+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "6564c9ef3924"
+down_revision = "e82228670d8a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # Indexes are built concurrently (hence the autocommit block above), so the
+    # tables stay writable during rollout. ``if_not_exists`` lets a failed run be retried
+    # after dropping any index left INVALID.
+
+    # Keep only the latest row per (of_login, login) pair, otherwise the unique index can't be built.
+    op.execute(
+        """
+        DELETE FROM friend f
+        USING friend newer
+        WHERE f.of_login = newer.of_login
+          AND f.login = newer.login
+          AND (f."addedAt", f.id) < (newer."addedAt", newer.id)
+        """
+    )
+    op.create_index(
+        "uq_friend_of_login_login",
+        "friend",
+        ["of_login", "login"],
+        unique=True,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_friend_of_login_added_at",
+        "friend",
+        ["of_login", sa.text('"addedAt" DESC'), "login"],
+        postgresql_include=["id"],
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_post_author_created_at",
+        "post",
+        ["author", sa.text('"createdAt" DESC'), sa.text("id DESC")],
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_session_user_login",
+        "session",
+        ["user_login"],
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.drop_index("ix_session_user_login", table_name="session", postgresql_concurrently=True, if_exists=True)
+    op.drop_index("ix_post_author_created_at", table_name="post", postgresql_concurrently=True, if_exists=True)
+    op.drop_index("ix_friend_of_login_added_at", table_name="friend", postgresql_concurrently=True, if_exists=True)
+    op.drop_index("uq_friend_of_login_login", table_name="friend", postgresql_concurrently=True, if_exists=True)
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
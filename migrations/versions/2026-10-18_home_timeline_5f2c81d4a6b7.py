@@ -0,0 +1,105 @@
+# type: ignore
+"""home timeline
+
+Revision ID: 5f2c81d4a6b7
+Revises: 0b7d3e52a1c8
+Create Date: 2026-10-18 13:41:07.215904+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "5f2c81d4a6b7"
+down_revision = "0b7d3e52a1c8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        schema_upgrades()
+        data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        data_downgrades()
+        schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    op.create_table(
+        "timeline_entry",
+        sa.Column("owner_login", sa.String(length=30), nullable=False),
+        sa.Column("createdAt", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("post_id", sa.GUID(length=16), nullable=False),
+        sa.Column("author", sa.String(length=30), nullable=False),
+        sa.ForeignKeyConstraint(["owner_login"], ["user.login"], name=op.f("fk_timeline_entry_owner_login_user")),
+        sa.ForeignKeyConstraint(
+            ["post_id"], ["post.id"], name=op.f("fk_timeline_entry_post_id_post"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("owner_login", "createdAt", "post_id", name=op.f("pk_timeline_entry")),
+    )
+    op.create_table(
+        "high_fanout_author",
+        sa.Column("login", sa.String(length=30), nullable=False),
+        sa.ForeignKeyConstraint(["login"], ["user.login"], name=op.f("fk_high_fanout_author_login_user")),
+        sa.PrimaryKeyConstraint("login", name=op.f("pk_high_fanout_author")),
+    )
+    # Followers of an author, read on every fan-out. Built without blocking writes, outside the transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_friend_login",
+            "friend",
+            ["login", "of_login"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_friend_login", table_name="friend", postgresql_concurrently=True, if_exists=True)
+    op.drop_table("high_fanout_author")
+    op.drop_table("timeline_entry")
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
@@ -0,0 +1,97 @@
+# type: ignore
+"""post reactions
+
+Revision ID: 0b7d3e52a1c8
+Revises: 6564c9ef3924
+Create Date: 2026-10-18 10:03:17.218904+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "0b7d3e52a1c8"
+down_revision = "6564c9ef3924"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        schema_upgrades()
+        data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        data_downgrades()
+        schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    op.create_table(
+        "reaction",
+        sa.Column("post_id", sa.GUID(length=16), nullable=False),
+        sa.Column("login", sa.String(length=30), nullable=False),
+        sa.Column("is_like", sa.Boolean(), nullable=False),
+        sa.Column("reactedAt", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["login"], ["user.login"], name=op.f("fk_reaction_login_user")),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"], name=op.f("fk_reaction_post_id_post"), ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("post_id", "login", name=op.f("pk_reaction")),
+    )
+    op.create_table(
+        "post_counter_shard",
+        sa.Column("post_id", sa.GUID(length=16), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column("likes", sa.Integer(), nullable=False),
+        sa.Column("dislikes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["post_id"], ["post.id"], name=op.f("fk_post_counter_shard_post_id_post"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("post_id", "shard", name=op.f("pk_post_counter_shard")),
+    )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.drop_table("post_counter_shard")
+    op.drop_table("reaction")
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
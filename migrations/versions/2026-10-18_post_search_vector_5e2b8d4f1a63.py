@@ -0,0 +1,99 @@
+# type: ignore
+"""post search vector
+
+Revision ID: 5e2b8d4f1a63
+Revises: 7c3f9a2d5e81
+Create Date: 2026-10-18 21:04:19.226841+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+from sqlalchemy.dialects import postgresql
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "5e2b8d4f1a63"
+down_revision = "7c3f9a2d5e81"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        schema_upgrades()
+        data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        data_downgrades()
+        schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # Adding a stored generated column rewrites "post" under an exclusive lock; on a large table run
+    # this in a maintenance window. The index is then built without blocking writes.
+    op.add_column(
+        "post",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english'::regconfig, content)", persisted=True),
+            nullable=False,
+        ),
+        if_not_exists=True,
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_post_search_vector",
+            "post",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_post_search_vector", table_name="post", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("post", "search_vector", if_exists=True)
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
@@ -0,0 +1,77 @@
+# type: ignore
+"""session epoch
+
+Revision ID: 3a7e5b9c1d24
+Revises: 9d41c7e0b2f5
+Create Date: 2026-10-18 17:41:09.214387+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "3a7e5b9c1d24"
+down_revision = "9d41c7e0b2f5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        schema_upgrades()
+        data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        data_downgrades()
+        schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # A constant default, so adding the column does not rewrite the table.
+    op.add_column("user", sa.Column("session_epoch", sa.Integer(), server_default=sa.text("0"), nullable=False))
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.drop_column("user", "session_epoch")
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
@@ -0,0 +1,135 @@
+# type: ignore
+"""session expiry
+
+Revision ID: 9d41c7e0b2f5
+Revises: 5f2c81d4a6b7
+Create Date: 2026-10-18 16:02:55.730114+00:00
+
+"""
+
+from __future__ import annotations
+
+import warnings
+from os import getenv
+
+import sqlalchemy as sa
+from advanced_alchemy.types import (
+    GUID,
+    ORA_JSONB,
+    DateTimeUTC,
+    EncryptedString,
+    EncryptedText,
+)
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = [
+    "downgrade",
+    "upgrade",
+    "schema_upgrades",
+    "schema_downgrades",
+    "data_upgrades",
+    "data_downgrades",
+]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "9d41c7e0b2f5"
+down_revision = "5f2c81d4a6b7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        schema_upgrades()
+        data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        data_downgrades()
+        schema_downgrades()
+
+
+# Opt-in: SESSION_PARTITIONING=daily turns "session" into a table partitioned by "exp", so expired
+# sessions are dropped a day at a time (see SessionService.maintain_partitions) instead of deleted row by row.
+PARTITIONED = getenv("SESSION_PARTITIONING") == "daily"
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    if not PARTITIONED:
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_session_exp",
+                "session",
+                ["exp"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        return
+
+    # Only unexpired sessions are carried over. In the migration's transaction, so sign-ins wait for it.
+    op.execute("LOCK TABLE session IN ACCESS EXCLUSIVE MODE")
+    _create_session_table("session_partitioned", primary_key=("id", "exp"), postgresql_partition_by="RANGE (exp)")
+    op.execute("CREATE TABLE session_default PARTITION OF session_partitioned DEFAULT")
+    _copy_unexpired_sessions("session_partitioned")
+    _replace_session_table("session_partitioned")
+    op.create_index("ix_session_exp", "session", ["exp"])
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    if not PARTITIONED:
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_session_exp", table_name="session", postgresql_concurrently=True, if_exists=True)
+        return
+
+    op.execute("LOCK TABLE session IN ACCESS EXCLUSIVE MODE")
+    _create_session_table("session_plain", primary_key=("id",))
+    _copy_unexpired_sessions("session_plain")
+    _replace_session_table("session_plain")
+
+
+def _create_session_table(name: str, primary_key: tuple[str, ...], **kwargs: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.GUID(length=16), nullable=False),
+        sa.Column("exp", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("user_login", sa.String(length=30), nullable=False),
+        sa.Column("sa_orm_sentinel", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_login"], ["user.login"], name=f"fk_{name}_user_login_user"),
+        sa.PrimaryKeyConstraint(*primary_key, name=f"pk_{name}"),
+        **kwargs,
+    )
+
+
+def _copy_unexpired_sessions(table: str) -> None:
+    op.execute(
+        f"INSERT INTO {table} (id, exp, user_login, sa_orm_sentinel)"  # noqa: S608
+        " SELECT id, exp, user_login, sa_orm_sentinel FROM session WHERE exp > now()"
+    )
+
+
+def _replace_session_table(table: str) -> None:
+    op.drop_table("session")
+    op.rename_table(table, "session")
+    op.execute(f"ALTER TABLE session RENAME CONSTRAINT pk_{table} TO pk_session")
+    op.execute(f"ALTER TABLE session RENAME CONSTRAINT fk_{table}_user_login_user TO fk_session_user_login_user")
+    op.create_index("ix_session_user_login", "session", ["user_login"])
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
@@ -4,6 +4,7 @@ from .auth import AuthController
 from .country import CountryController
 from .friends import FriendsController
 from .me import MeController
+from .metrics import get_metrics
 from .ping import ping
 from .posts import PostsController
 from .profiles import get_profile
@@ -20,5 +21,6 @@ def create_router() -> Router:
             get_profile,
             FriendsController,
             PostsController,
+            get_metrics,
         ),
     )
@@ -1,5 +1,6 @@
 from datetime import UTC, datetime, timedelta
 from typing import Self
+from uuid import uuid4
 
 from advanced_alchemy.exceptions import IntegrityError
 from litestar import Controller, post
@@ -40,7 +41,7 @@ class AuthController(Controller):
         country_service: CountryService,
         user_service: UserService,
     ) -> dict[str, User]:
-        if not await country_service.exists(alpha2=data.country_code):
+        if not (await country_service.catalogue()).exists(data.country_code):
             raise ValidationException("Country not found")
         try:
             user = await user_service.create(data.model_dump())
@@ -56,7 +57,8 @@ class AuthController(Controller):
         session_service: SessionService,
     ) -> dict[str, str]:
         user = await user_service.authentication(login=data.login, password=data.password)
-        session = Session(exp=datetime.now(UTC) + timedelta(hours=1), user_login=user.login)
-        await session_service.create(session)
-        token = sessions.auth.create_token(session)
+        session = Session(id=uuid4(), exp=datetime.now(UTC) + timedelta(hours=1), user_login=user.login)
+        if not sessions.auth.stateless:
+            await session_service.create(session)
+        token = sessions.auth.create_token(session, session_epoch=user.session_epoch)
         return {"token": token}
@@ -1,27 +1,29 @@
-from datetime import UTC, datetime
 from typing import Annotated, Any, Self
 
-import sqlalchemy as sa
-from advanced_alchemy.filters import LimitOffset, OrderBy
-from litestar import Controller, Request, get, post
+from litestar import Controller, Request, Response, get, post
 from litestar.di import Provide
 from litestar.exceptions import NotFoundException
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_200_OK
 
-from pulse_backend.db_models import Friend, Session, User
+from pulse_backend.background import timeline_fanout
+from pulse_backend.db_models import Session, User
 from pulse_backend.dependencies import (
     provide_friend_service,
+    provide_read_friend_service,
+    provide_timeline_service,
     provide_user_service,
 )
-from pulse_backend.schemas import AddFriend
-from pulse_backend.services import FriendService, UserService
+from pulse_backend.pagination import FRIEND_KEYSET, page_response
+from pulse_backend.schemas import AddFriend, FriendsBatch
+from pulse_backend.services import FriendService, TimelineService, UserService
 
 
 class FriendsController(Controller):
     dependencies = {  # noqa: RUF012
         "user_service": Provide(provide_user_service),
         "friend_service": Provide(provide_friend_service),
+        "timeline_service": Provide(provide_timeline_service),
     }
 
     @post("/api/friends/add", status_code=HTTP_200_OK)
@@ -31,6 +33,7 @@ class FriendsController(Controller):
         request: Request[User, Session, Any],
         user_service: UserService,
         friend_service: FriendService,
+        timeline_service: TimelineService,
     ) -> dict[str, Any]:
         friend_user: User | None = await user_service.get_one_or_none(login=data.login)
         if friend_user is None:
@@ -38,12 +41,9 @@ class FriendsController(Controller):
         if friend_user.login == request.user.login:
             return {"status": "ok"}
 
-        friend = Friend(
-            of_login=request.user.login,
-            login=friend_user.login,
-            addedAt=datetime.now(UTC),
-        )
-        await friend_service.upsert(friend, match_fields=["of_login", "login"])
+        await friend_service.add(request.user.login, friend_user.login)
+        if timeline_fanout.enabled:
+            await timeline_service.follow(request.user.login, friend_user.login)
 
         return {"status": "ok"}
 
@@ -53,23 +53,62 @@ class FriendsController(Controller):
         data: AddFriend,
         request: Request[User, Session, Any],
         friend_service: FriendService,
+        timeline_service: TimelineService,
     ) -> dict[str, Any]:
-        stmt = sa.delete(Friend).where(Friend.of_login == request.user.login).where(Friend.login == data.login)
-        await friend_service.repository.session.execute(stmt)
-        await friend_service.repository.session.commit()
+        await friend_service.remove(request.user.login, data.login)
+        if timeline_fanout.enabled:
+            await timeline_service.unfollow(request.user.login, data.login)
         return {"status": "ok"}
 
-    @get("/api/friends")
+    @post("/api/friends/add-many", status_code=HTTP_200_OK, opt={"query_budget": 6})
+    async def add_friends(
+        self: Self,
+        data: FriendsBatch,
+        request: Request[User, Session, Any],
+        friend_service: FriendService,
+        timeline_service: TimelineService,
+    ) -> dict[str, Any]:
+        logins = list(dict.fromkeys(data.logins))
+        added = set(await friend_service.add_many(request.user.login, logins))
+        if added and timeline_fanout.enabled:
+            await timeline_service.follow_many(request.user.login, list(added))
+
+        results = {
+            login: "added" if login in added else "self" if login == request.user.login else "not_found"
+            for login in logins
+        }
+        return {"status": "ok", "results": results}
+
+    @post("/api/friends/remove-many", status_code=HTTP_200_OK, opt={"query_budget": 6})
+    async def remove_friends(
+        self: Self,
+        data: FriendsBatch,
+        request: Request[User, Session, Any],
+        friend_service: FriendService,
+        timeline_service: TimelineService,
+    ) -> dict[str, Any]:
+        logins = list(dict.fromkeys(data.logins))
+        removed = set(await friend_service.remove_many(request.user.login, logins))
+        if removed and timeline_fanout.enabled:
+            await timeline_service.unfollow_many(request.user.login, list(removed))
+
+        results = {login: "removed" if login in removed else "not_friend" for login in logins}
+        return {"status": "ok", "results": results}
+
+    @get("/api/friends", dependencies={"friend_service": Provide(provide_read_friend_service)})
     async def list_friends(
         self: Self,
         request: Request[User, Session, Any],
         friend_service: FriendService,
         limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
         offset: Annotated[int, Parameter(ge=0)] = 0,
-    ) -> list[dict[str, Any]]:
+        cursor: str | None = None,
+    ) -> Response[list[dict[str, Any]]]:
         friends = await friend_service.list(
-            OrderBy(field_name="addedAt", sort_order="desc"),
-            LimitOffset(limit=limit, offset=offset),
+            *FRIEND_KEYSET.filters(limit=limit, offset=offset, cursor=cursor),
             of_login=request.user.login,
         )
-        return [{"login": friend.login, "addedAt": friend.addedAt.isoformat()} for friend in friends]
+        return page_response(
+            [{"login": friend.login, "addedAt": friend.addedAt.isoformat()} for friend in friends],
+            FRIEND_KEYSET.next_cursor(friends, limit),
+        )
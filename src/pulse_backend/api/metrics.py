@@ -0,0 +1,102 @@
+from typing import Any
+
+from litestar import get
+
+from pulse_backend import background, crypt
+from pulse_backend.cache import TTLCache, session_cache, user_cache, visibility_cache
+from pulse_backend.database import pool_metrics
+from pulse_backend.metrics import metrics, render_samples
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@get("/metrics", media_type=CONTENT_TYPE, include_in_schema=False, sync_to_thread=False)
+def get_metrics() -> str:
+    """Metrics of this worker process in the Prometheus text format."""
+    lines = metrics.render()
+
+    caches: dict[str, TTLCache[Any, Any]] = {
+        "session": session_cache,
+        "user": user_cache,
+        "visibility": visibility_cache,
+    }
+    render_samples(
+        lines,
+        "pulse_cache_hits_total",
+        "counter",
+        "Cache lookups that found an entry.",
+        (({"cache": name}, cache.hits) for name, cache in caches.items()),
+    )
+    render_samples(
+        lines,
+        "pulse_cache_misses_total",
+        "counter",
+        "Cache lookups that found no entry.",
+        (({"cache": name}, cache.misses) for name, cache in caches.items()),
+    )
+    render_samples(
+        lines,
+        "pulse_cache_entries",
+        "gauge",
+        "Entries in the cache.",
+        (({"cache": name}, len(cache)) for name, cache in caches.items()),
+    )
+
+    pool = pool_metrics.stats()
+    render_samples(
+        lines,
+        "pulse_db_pool_connections",
+        "gauge",
+        "Connections of the primary database pool.",
+        (
+            ({"state": "size"}, pool.size),
+            ({"state": "checked_out"}, pool.checked_out),
+            ({"state": "overflow"}, pool.overflow),
+            ({"state": "capacity"}, pool.capacity),
+        ),
+    )
+    render_samples(lines, "pulse_db_pool_saturation", "gauge", "Checked out / capacity.", [({}, pool.saturation)])
+    render_samples(lines, "pulse_db_pool_checkouts_total", "counter", "Connection checkouts.", [({}, pool.checkouts)])
+    render_samples(
+        lines,
+        "pulse_db_pool_checkout_timeouts_total",
+        "counter",
+        "Checkouts that timed out.",
+        [({}, pool.checkout_timeouts)],
+    )
+    render_samples(
+        lines,
+        "pulse_db_pool_checkout_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a connection.",
+        [({}, pool.checkout_wait_total)],
+    )
+
+    hasher = crypt.hasher.stats()
+    render_samples(
+        lines,
+        "pulse_bcrypt_workers",
+        "gauge",
+        "Password hashing workers.",
+        (({"state": "max"}, hasher.max_workers), ({"state": "in_flight"}, hasher.in_flight)),
+    )
+    render_samples(
+        lines, "pulse_bcrypt_queue_depth", "gauge", "Hashes waiting for a worker.", [({}, hasher.queue_depth)]
+    )
+
+    reaper = background.session_reaper_stats
+    render_samples(
+        lines,
+        "pulse_session_reaper_deleted_total",
+        "counter",
+        "Expired sessions deleted.",
+        [({}, reaper.sessions_deleted)],
+    )
+    render_samples(
+        lines,
+        "pulse_session_reaper_partitions_dropped_total",
+        "counter",
+        "Expired session partitions dropped.",
+        [({}, reaper.partitions_dropped)],
+    )
+    return "\n".join(lines) + "\n"
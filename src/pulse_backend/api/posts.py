@@ -1,38 +1,50 @@
 from datetime import UTC, datetime
-from typing import Annotated, Any, Self
+from typing import Annotated, Any, Literal, Self
 from uuid import UUID, uuid4
 
-from advanced_alchemy.filters import LimitOffset, OrderBy
-from litestar import Controller, Request, get, post
+from litestar import Controller, MediaType, Request, Response, get, post
 from litestar.di import Provide
-from litestar.exceptions import NotFoundException
+from litestar.exceptions import NotFoundException, ValidationException
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_200_OK
 
-from pulse_backend.db_models import Friend, Post, Session, User
+from pulse_backend.background import timeline_fanout, trending_tags
+from pulse_backend.db_models import Post, Session, User
 from pulse_backend.dependencies import (
-    provide_friend_service,
     provide_post_service,
-    provide_user_service,
+    provide_read_post_service,
+    provide_read_timeline_service,
+    provide_read_visibility_service,
+    provide_timeline_service,
+    provide_visibility_service,
+)
+from pulse_backend.pagination import POST_KEYSET, SEARCH_KEYSET, page_response
+from pulse_backend.schemas import MAX_POSTS_BATCH, CreatePost, CreatePosts
+from pulse_backend.services import PostService, TimelineService, VisibilityService
+from pulse_backend.views import (
+    PostBatchView,
+    PostView,
+    encode_post,
+    encode_post_batch,
+    encode_posts,
+    encode_tag_trends,
 )
-from pulse_backend.schemas import CreatePost
-from pulse_backend.services import FriendService, PostService, UserService
 
 
 class PostsController(Controller):
     dependencies = {  # noqa: RUF012
         "post_service": Provide(provide_post_service),
-        "friend_service": Provide(provide_friend_service),
-        "user_service": Provide(provide_user_service),
+        "timeline_service": Provide(provide_timeline_service),
+        "visibility_service": Provide(provide_visibility_service),
     }
 
-    @post("/api/posts/new", status_code=HTTP_200_OK)
+    @post("/api/posts/new", status_code=HTTP_200_OK, media_type=MediaType.JSON, opt={"query_budget": 4})
     async def create_post(
         self: Self,
         data: CreatePost,
         request: Request[User, Session, Any],
         post_service: PostService,
-    ) -> dict[str, Any]:
+    ) -> Response[bytes]:
         post_ = Post(
             id=uuid4(),
             content=data.content,
@@ -41,79 +53,229 @@ class PostsController(Controller):
             createdAt=datetime.now(UTC),
         )
         post_ = await post_service.create(post_)
-        return {
-            "id": post_.id,
-            "content": post_.content,
-            "author": post_.author,
-            "tags": post_.tags,
-            "createdAt": post_.createdAt.isoformat(),
-            "likesCount": post_.likesCount,
-            "dislikesCount": post_.dislikesCount,
-        }
-
-    @get("/api/posts/{postId:uuid}")
+        timeline_fanout.submit(post_)
+        trending_tags.record(post_.tags, post_.createdAt)
+        return Response(encode_post(PostView.from_post(post_)), media_type=MediaType.JSON)
+
+    @post("/api/posts/batch", status_code=HTTP_200_OK, media_type=MediaType.JSON, opt={"query_budget": 4})
+    async def create_posts(
+        self: Self,
+        data: CreatePosts,
+        request: Request[User, Session, Any],
+        post_service: PostService,
+    ) -> Response[bytes]:
+        created_at = datetime.now(UTC)
+        posts = [
+            Post(
+                id=uuid4(),
+                content=post_.content,
+                author=request.user.login,
+                tags=post_.tags,
+                createdAt=created_at,
+            )
+            for post_ in data.posts
+        ]
+        views = await post_service.insert_many(posts)
+        for post_ in posts:
+            timeline_fanout.submit(post_)
+            trending_tags.record(post_.tags, post_.createdAt)
+        return Response(encode_posts(views), media_type=MediaType.JSON)
+
+    @get(
+        "/api/posts",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 4},
+        dependencies={"visibility_service": Provide(provide_read_visibility_service)},
+    )
+    async def get_posts(
+        self: Self,
+        ids: list[str],
+        request: Request[User, Session, Any],
+        visibility_service: VisibilityService,
+    ) -> Response[bytes]:
+        """Fetch posts by id, given as repeated ``ids`` parameters or comma-separated."""
+        try:
+            post_ids = list(dict.fromkeys(UUID(part) for value in ids for part in value.split(",") if part))
+        except ValueError as e:
+            raise ValidationException("Invalid post id") from e
+        if len(post_ids) > MAX_POSTS_BATCH:
+            msg = f"At most {MAX_POSTS_BATCH} posts can be fetched at once"
+            raise ValidationException(msg)
+
+        found = await visibility_service.get_posts(post_ids, viewer_login=request.user.login)
+        batch = PostBatchView(
+            posts=[found[post_id][0] for post_id in post_ids if post_id in found and found[post_id][1]],
+            notFound=[post_id for post_id in post_ids if post_id not in found],
+            noAccess=[post_id for post_id in post_ids if post_id in found and not found[post_id][1]],
+        )
+        return Response(encode_post_batch(batch), media_type=MediaType.JSON)
+
+    @get(
+        "/api/posts/search",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 4},
+        dependencies={"visibility_service": Provide(provide_read_visibility_service)},
+    )
+    async def search_posts(  # noqa: PLR0913
+        self: Self,
+        tag: Annotated[list[str], Parameter(min_items=1, max_items=10)],
+        request: Request[User, Session, Any],
+        visibility_service: VisibilityService,
+        match: Literal["any", "all"] = "any",
+        limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
+        offset: Annotated[int, Parameter(ge=0)] = 0,
+        cursor: str | None = None,
+    ) -> Response[bytes]:
+        if any(not 0 < len(tag_) <= 20 for tag_ in tag):  # noqa: PLR2004
+            raise ValidationException("Tags must be 1 to 20 characters long")
+        posts = await visibility_service.search_by_tags(
+            list(dict.fromkeys(tag)),
+            viewer_login=request.user.login,
+            match_all=match == "all",
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        return page_response(encode_posts(posts), POST_KEYSET.next_cursor(posts, limit))
+
+    @get("/api/posts/trending", media_type=MediaType.JSON, opt={"query_budget": 5})
+    async def get_trending_tags(
+        self: Self,
+        post_service: PostService,
+        window: Literal["1h", "24h"] = "1h",
+        limit: Annotated[int, Parameter(ge=1, le=trending_tags.limit)] = 10,
+    ) -> Response[bytes]:
+        """Tags of the posts of the last hour or day, ranked by post count with older posts worth less."""
+        trends = trending_tags.top(window, limit)
+        if trends is None:
+            await trending_tags.refresh(post_service)
+            trends = trending_tags.top(window, limit) or []
+        return Response(encode_tag_trends(trends), media_type=MediaType.JSON)
+
+    @get(
+        "/api/posts/search/text",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 4},
+        dependencies={"visibility_service": Provide(provide_read_visibility_service)},
+    )
+    async def search_posts_text(  # noqa: PLR0913
+        self: Self,
+        q: Annotated[str, Parameter(min_length=1, max_length=200)],
+        request: Request[User, Session, Any],
+        visibility_service: VisibilityService,
+        limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
+        offset: Annotated[int, Parameter(ge=0)] = 0,
+        cursor: str | None = None,
+    ) -> Response[bytes]:
+        """Full-text search over post content, best matches first."""
+        hits = await visibility_service.search_text(
+            q, viewer_login=request.user.login, limit=limit, offset=offset, cursor=cursor
+        )
+        next_cursor = None
+        if limit > 0 and len(hits) == limit:
+            last, rank = hits[-1]
+            next_cursor = SEARCH_KEYSET.encode([rank, last.createdAt, last.id])
+        return page_response(encode_posts([post_ for post_, _ in hits]), next_cursor)
+
+    @get(
+        "/api/posts/{postId:uuid}",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 5},
+        dependencies={"visibility_service": Provide(provide_read_visibility_service)},
+    )
     async def get_post(
         self: Self,
         post_id: Annotated[UUID, Parameter(query="postId")],
         request: Request[User, Session, Any],
-        post_service: PostService,
-        friend_service: FriendService,
-    ) -> dict[str, Any]:
-        post_ = await post_service.get_one_or_none(id=post_id)
+        visibility_service: VisibilityService,
+    ) -> Response[bytes]:
+        post_, visible = await visibility_service.get_post(post_id, viewer_login=request.user.login)
         if post_ is None:
             raise NotFoundException("Post not found")
+        if not visible:
+            raise NotFoundException("No access to post")
+        return Response(encode_post(post_), media_type=MediaType.JSON)
 
-        friend: Friend | None = await friend_service.get_one_or_none(of_login=post_.author, login=request.user.login)
-
-        f = False
-        if post_.user.is_public is True:
-            f = True
-        if post_.user.is_public is False:
-            if request.user.login == post_.author:
-                f = True
-            if isinstance(friend, Friend):
-                f = True
+    @post(
+        "/api/posts/{postId:uuid}/like",
+        status_code=HTTP_200_OK,
+        media_type=MediaType.JSON,
+        opt={"query_budget": 8},
+    )
+    async def like_post(
+        self: Self,
+        post_id: Annotated[UUID, Parameter(query="postId")],
+        request: Request[User, Session, Any],
+        post_service: PostService,
+        visibility_service: VisibilityService,
+    ) -> Response[bytes]:
+        return await _react(post_id, request.user, post_service, visibility_service, is_like=True)
 
-        if f is False:
-            raise NotFoundException("No access to post")
+    @post(
+        "/api/posts/{postId:uuid}/dislike",
+        status_code=HTTP_200_OK,
+        media_type=MediaType.JSON,
+        opt={"query_budget": 8},
+    )
+    async def dislike_post(
+        self: Self,
+        post_id: Annotated[UUID, Parameter(query="postId")],
+        request: Request[User, Session, Any],
+        post_service: PostService,
+        visibility_service: VisibilityService,
+    ) -> Response[bytes]:
+        return await _react(post_id, request.user, post_service, visibility_service, is_like=False)
 
-        return {
-            "id": post_.id,
-            "content": post_.content,
-            "author": post_.author,
-            "tags": post_.tags,
-            "createdAt": post_.createdAt.isoformat(),
-            "likesCount": post_.likesCount,
-            "dislikesCount": post_.dislikesCount,
-        }
-
-    @get("/api/posts/feed/my")
+    @get(
+        "/api/posts/feed/my",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 5},
+        dependencies={"post_service": Provide(provide_read_post_service)},
+    )
     async def feed_my(
         self: Self,
         request: Request[User, Session, Any],
         post_service: PostService,
         limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
         offset: Annotated[int, Parameter(ge=0)] = 0,
-    ) -> list[dict[str, Any]]:
-        posts = await post_service.list(
-            OrderBy(field_name="createdAt", sort_order="desc"),
-            LimitOffset(limit=limit, offset=offset),
-            author=request.user.login,
+        cursor: str | None = None,
+    ) -> Response[bytes]:
+        posts = await post_service.list_by_author(request.user.login, limit=limit, offset=offset, cursor=cursor)
+        return page_response(encode_posts(posts), POST_KEYSET.next_cursor(posts, limit))
+
+    @get(
+        "/api/posts/friends-feed",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 5},
+        dependencies={
+            "timeline_service": Provide(provide_read_timeline_service),
+            "visibility_service": Provide(provide_read_visibility_service),
+        },
+    )
+    async def feed_friends(  # noqa: PLR0913
+        self: Self,
+        request: Request[User, Session, Any],
+        visibility_service: VisibilityService,
+        timeline_service: TimelineService,
+        limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
+        offset: Annotated[int, Parameter(ge=0)] = 0,
+        cursor: str | None = None,
+    ) -> Response[bytes]:
+        list_posts = timeline_service.list_home if timeline_fanout.enabled else visibility_service.list_friends_posts
+        posts = await list_posts(
+            request.user.login,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
         )
-        return [
-            {
-                "id": post_.id,
-                "content": post_.content,
-                "author": post_.author,
-                "tags": post_.tags,
-                "createdAt": post_.createdAt.isoformat(),
-                "likesCount": post_.likesCount,
-                "dislikesCount": post_.dislikesCount,
-            }
-            for post_ in posts
-        ]
+        return page_response(encode_posts(posts), POST_KEYSET.next_cursor(posts, limit))
 
-    @get("/api/posts/feed/{login:str}")
+    @get(
+        "/api/posts/feed/{login:str}",
+        media_type=MediaType.JSON,
+        opt={"query_budget": 5},
+        dependencies={"visibility_service": Provide(provide_read_visibility_service)},
+    )
     async def feed_user(  # noqa: PLR0913
         self: Self,
         login: Annotated[
@@ -124,44 +286,38 @@ class PostsController(Controller):
             ),
         ],
         request: Request[User, Session, Any],
-        user_service: UserService,
-        friend_service: FriendService,
-        post_service: PostService,
+        visibility_service: VisibilityService,
         limit: Annotated[int, Parameter(ge=0, le=50)] = 5,
         offset: Annotated[int, Parameter(ge=0)] = 0,
-    ) -> list[dict[str, Any]]:
-        user = await user_service.get_one_or_none(login=login)
-        if user is None:
+        cursor: str | None = None,
+    ) -> Response[bytes]:
+        author, visible, posts = await visibility_service.list_posts(
+            login,
+            viewer_login=request.user.login,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        if author is None:
             raise NotFoundException("User not found")
+        if not visible:
+            raise NotFoundException("No access to user's posts")
+        return page_response(encode_posts(posts), POST_KEYSET.next_cursor(posts, limit))
 
-        friend: Friend | None = await friend_service.get_one_or_none(of_login=user.login, login=request.user.login)
-
-        f = False
-        if user.is_public is True:
-            f = True
-        if user.is_public is False:
-            if user.login == request.user.login:
-                f = True
-            if isinstance(friend, Friend):
-                f = True
 
-        if f is False:
-            raise NotFoundException("No access to user's posts")
+async def _react(
+    post_id: UUID,
+    user: User,
+    post_service: PostService,
+    visibility_service: VisibilityService,
+    *,
+    is_like: bool,
+) -> Response[bytes]:
+    post_, visible = await visibility_service.get_post(post_id, viewer_login=user.login)
+    if post_ is None:
+        raise NotFoundException("Post not found")
+    if not visible:
+        raise NotFoundException("No access to post")
 
-        posts = await post_service.list(
-            OrderBy(field_name="createdAt", sort_order="desc"),
-            LimitOffset(limit=limit, offset=offset),
-            author=login,
-        )
-        return [
-            {
-                "id": post_.id,
-                "content": post_.content,
-                "author": post_.author,
-                "tags": post_.tags,
-                "createdAt": post_.createdAt.isoformat(),
-                "likesCount": post_.likesCount,
-                "dislikesCount": post_.dislikesCount,
-            }
-            for post_ in posts
-        ]
+    post_ = await post_service.react(post_id, user.login, is_like=is_like)
+    return Response(encode_post(post_), media_type=MediaType.JSON)
@@ -1,17 +1,15 @@
 from dataclasses import dataclass
-from os import getenv
+from functools import partial
 from typing import Any
 
 from litestar import Litestar, Request, Response
-from litestar.contrib.sqlalchemy.plugins import (
-    SQLAlchemyAsyncConfig,
-    SQLAlchemyPlugin,
-)
+from litestar.contrib.sqlalchemy.plugins import SQLAlchemyPlugin
+from litestar.di import Provide
 from litestar.exceptions import HTTPException
-from sqlalchemy import URL
 
-from pulse_backend import sessions
+from pulse_backend import background, crypt, invalidation, metrics, query_audit, sessions
 from pulse_backend.api import create_router
+from pulse_backend.database import DatabaseSettings, ReadReplicas, create_db_config
 
 
 @dataclass(frozen=True, slots=True)
@@ -27,22 +25,21 @@ def exc_handler(_: Request[Any, Any, Any], exc: HTTPException) -> Response[Error
 
 
 def create_app() -> Litestar:
+    db_settings = DatabaseSettings.from_env()
+    db_config = create_db_config(db_settings)
+    read_replicas = ReadReplicas.from_settings(db_settings)
     return Litestar(
         route_handlers=(create_router(),),
         exception_handlers={HTTPException: exc_handler},
-        on_app_init=(sessions.auth.on_app_init,),
-        plugins=(
-            SQLAlchemyPlugin(
-                config=SQLAlchemyAsyncConfig(
-                    connection_string=URL.create(
-                        drivername="postgresql+asyncpg",
-                        username=getenv("POSTGRES_USERNAME", "postgres"),
-                        password=getenv("POSTGRES_PASSWORD"),
-                        host=getenv("POSTGRES_HOST", "localhost"),
-                        port=int(getenv("POSTGRES_PORT", "5432")),
-                        database=getenv("POSTGRES_DATABASE", "postgres"),
-                    ).render_as_string(hide_password=False)
-                )
-            ),
+        dependencies={"read_db_session": Provide(read_replicas.provide_session)},
+        before_request=read_replicas.mark_writer,
+        after_response=read_replicas.mark_writer,
+        on_app_init=(sessions.auth.on_app_init, query_audit.audit.on_app_init, metrics.on_app_init),
+        on_startup=(
+            partial(background.start, db_config),
+            partial(invalidation.listener.start, db_config),
+            read_replicas.start,
         ),
+        on_shutdown=(crypt.hasher.shutdown, background.stop, invalidation.listener.stop, read_replicas.stop),
+        plugins=(SQLAlchemyPlugin(config=db_config),),
     )
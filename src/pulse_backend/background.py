@@ -0,0 +1,252 @@
+__all__ = (
+    "PeriodicTask",
+    "ReaperStats",
+    "TimelineFanOut",
+    "TrendingTags",
+    "fold_reaction_counters",
+    "reap_expired_sessions",
+    "refresh_trending_tags",
+    "session_reaper_stats",
+    "start",
+    "stop",
+    "timeline_fanout",
+    "trending_tags",
+)
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from os import getenv
+from typing import Self
+
+from litestar.contrib.sqlalchemy.plugins import SQLAlchemyAsyncConfig
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from pulse_backend.database import create_session_maker
+from pulse_backend.db_models import Post
+from pulse_backend.services import TRENDING_WINDOWS, PostService, SessionService, TimelineService
+from pulse_backend.views import TagTrend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PeriodicTask:
+    """Runs ``job`` with a fresh database session every ``interval`` seconds while the app is up.
+
+    A non-positive interval disables the task.
+    """
+
+    name: str
+    interval: float
+    job: Callable[[AsyncSession], Awaitable[object]]
+    _task: "asyncio.Task[None] | None" = field(default=None, init=False)
+
+    def start(self: Self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(session_maker), name=self.name)
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self: Self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with session_maker() as session:
+                    await self.job(session)
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+
+
+async def _fold_reaction_counters(session: AsyncSession) -> None:
+    await PostService(session=session, auto_commit=True).fold_counters()
+
+
+fold_reaction_counters = PeriodicTask(
+    name="fold-reaction-counters",
+    interval=float(getenv("REACTION_FOLD_INTERVAL", "5")),
+    job=_fold_reaction_counters,
+)
+
+
+@dataclass(slots=True)
+class ReaperStats:
+    runs: int = 0
+    sessions_deleted: int = 0
+    partitions_dropped: int = 0
+    last_deleted: int = 0
+    last_run_at: float | None = None
+    last_duration: float = 0
+
+
+session_reaper_stats = ReaperStats()
+
+_SESSION_REAP_BATCH_SIZE = int(getenv("SESSION_REAP_BATCH_SIZE", "1000"))
+
+
+async def _reap_expired_sessions(session: AsyncSession) -> None:
+    start = time.perf_counter()
+    session_service = SessionService(session=session, auto_commit=True)
+    dropped = await session_service.maintain_partitions()
+    deleted = await session_service.reap_expired(batch_size=_SESSION_REAP_BATCH_SIZE)
+    stats = session_reaper_stats
+    stats.runs += 1
+    stats.sessions_deleted += deleted
+    stats.partitions_dropped += dropped
+    stats.last_deleted = deleted
+    stats.last_run_at = time.time()
+    stats.last_duration = time.perf_counter() - start
+    if deleted or dropped:
+        logger.info("Reaped %d expired sessions and %d session partitions", deleted, dropped)
+
+
+reap_expired_sessions = PeriodicTask(
+    name="reap-expired-sessions",
+    interval=float(getenv("SESSION_REAP_INTERVAL", "60")),
+    job=_reap_expired_sessions,
+)
+
+
+@dataclass(slots=True)
+class TrendingTags:
+    """Top tags of each trending window, cached in this process.
+
+    ``record`` counts new posts per minute and tag in memory. ``refresh`` adds those counts to the
+    shared minute and hour buckets, so that the posts of every worker are included, prunes the
+    buckets no window covers and reloads the top ``limit`` tags of each window. Requests read the
+    cached lists, which are refreshed on demand once older than ``max_age`` seconds.
+    """
+
+    max_age: float
+    limit: int = 50
+    _pending: Counter[tuple[datetime, str]] = field(default_factory=Counter, init=False)
+    _top: dict[str, list[TagTrend]] = field(default_factory=dict, init=False)
+    _refreshed_at: float | None = field(default=None, init=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
+
+    def record(self: Self, tags: Iterable[str], created_at: datetime) -> None:
+        minute = created_at.astimezone(UTC).replace(second=0, microsecond=0)
+        for tag in set(tags):
+            self._pending[minute, tag] += 1
+
+    def top(self: Self, window: str, limit: int) -> list[TagTrend] | None:
+        """Return the cached top tags of ``window``, or ``None`` if they are missing or too old."""
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_age:
+            return None
+        return self._top.get(window, [])[:limit]
+
+    async def refresh(self: Self, post_service: PostService) -> None:
+        refreshed_at = self._refreshed_at
+        async with self._lock:
+            if self._refreshed_at != refreshed_at:
+                # Refreshed by a concurrent caller while this one waited.
+                return
+            pending, self._pending = self._pending, Counter()
+            if pending:
+                try:
+                    await post_service.add_tag_counts(pending)
+                except Exception:
+                    # Kept for the next refresh.
+                    self._pending.update(pending)
+                    raise
+            now = datetime.now(UTC)
+            await post_service.prune_tag_buckets(now)
+            self._top = {
+                name: await post_service.trending_tags(window, now=now, limit=self.limit)
+                for name, window in TRENDING_WINDOWS.items()
+            }
+            self._refreshed_at = time.monotonic()
+
+
+trending_tags = TrendingTags(max_age=float(getenv("TRENDING_MAX_AGE", "30")))
+
+
+async def _refresh_trending_tags(session: AsyncSession) -> None:
+    await trending_tags.refresh(PostService(session=session, auto_commit=True))
+
+
+refresh_trending_tags = PeriodicTask(
+    name="refresh-trending-tags",
+    interval=float(getenv("TRENDING_REFRESH_INTERVAL", "15")),
+    job=_refresh_trending_tags,
+)
+
+TASKS: tuple[PeriodicTask, ...] = (fold_reaction_counters, reap_expired_sessions, refresh_trending_tags)
+
+
+@dataclass(slots=True)
+class TimelineFanOut:
+    """Copies new posts into the materialized home timelines off the request path.
+
+    Disabled unless ``enabled``; the queue lives in this process, so posts still queued
+    when the worker stops are not fanned out.
+    """
+
+    enabled: bool
+    max_followers: int
+    batch_size: int = 100
+    _queue: "asyncio.Queue[Post] | None" = field(default=None, init=False)
+    _task: "asyncio.Task[None] | None" = field(default=None, init=False)
+
+    def submit(self: Self, post: Post) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(post)
+
+    def start(self: Self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        if self.enabled and self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(session_maker), name="timeline-fan-out")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._queue = None
+
+    async def _run(self: Self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        queue = self._queue
+        if queue is None:
+            return
+        while True:
+            posts = [await queue.get()]
+            while len(posts) < self.batch_size and not queue.empty():
+                posts.append(queue.get_nowait())
+            try:
+                async with session_maker() as session:
+                    await TimelineService(session=session, auto_commit=True).fan_out(
+                        posts,
+                        max_followers=self.max_followers,
+                    )
+            except Exception:
+                logger.exception("Fan-out of %d posts failed", len(posts))
+
+
+timeline_fanout = TimelineFanOut(
+    enabled=getenv("HOME_TIMELINE", "on-read") == "materialized",
+    max_followers=int(getenv("TIMELINE_FANOUT_MAX_FOLLOWERS", "10000")),
+)
+
+
+def start(db_config: SQLAlchemyAsyncConfig) -> None:
+    session_maker = create_session_maker(db_config)
+    for task in TASKS:
+        task.start(session_maker)
+    timeline_fanout.start(session_maker)
+
+
+async def stop() -> None:
+    for task in TASKS:
+        await task.stop()
+    await timeline_fanout.stop()
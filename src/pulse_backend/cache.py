@@ -0,0 +1,176 @@
+__all__ = (
+    "Audience",
+    "SessionCache",
+    "TTLCache",
+    "UserCache",
+    "VisibilityCache",
+    "session_cache",
+    "user_cache",
+    "visibility_cache",
+)
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from os import getenv
+from typing import Self
+
+from pulse_backend.db_models import Session, User
+
+
+class TTLCache[K: Hashable, V]:
+    """Bounded LRU mapping whose entries also expire at a given wall-clock time."""
+
+    def __init__(
+        self: Self,
+        maxsize: int,
+        ttl: float | None = None,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def __len__(self: Self) -> int:
+        return len(self._data)
+
+    def __contains__(self: Self, key: K) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self: Self, key: K, *, count: bool = True) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            if count:
+                self.misses += 1
+            return None
+        value, expires_at = item
+        if expires_at <= self.timer():
+            self.pop(key)
+            if count:
+                self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value
+
+    def set(self: Self, key: K, value: V, expires_at: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        now = self.timer()
+        if self.ttl is not None:
+            expires_at = now + self.ttl if expires_at is None else min(expires_at, now + self.ttl)
+        if expires_at is None or expires_at <= now:
+            return
+        if key in self._data:
+            self.pop(key)
+        self._data[key] = (value, expires_at)
+        while len(self._data) > self.maxsize:
+            self.pop(next(iter(self._data)))
+
+    def pop(self: Self, key: K) -> V | None:
+        item = self._data.pop(key, None)
+        if item is None:
+            return None
+        self._on_evict(key, item[0])
+        return item[0]
+
+    def clear(self: Self) -> None:
+        for key in list(self._data):
+            self.pop(key)
+
+    def _on_evict(self: Self, key: K, value: V) -> None:
+        pass
+
+
+class SessionCache(TTLCache[str, Session]):
+    """Verified sessions (with their users) by ``jti``, kept until the session expires."""
+
+    def __init__(self: Self, maxsize: int, ttl: float | None = None) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._by_login: dict[str, set[str]] = {}
+
+    def add(self: Self, session: Session) -> None:
+        key = str(session.id)
+        self.set(key, session, expires_at=session.exp.timestamp())
+        if key in self._data:
+            self._by_login.setdefault(session.user_login, set()).add(key)
+
+    def invalidate_user(self: Self, login: str) -> None:
+        for key in self._by_login.pop(login, set()):
+            self._data.pop(key, None)
+
+    def _on_evict(self: Self, key: str, value: Session) -> None:
+        keys = self._by_login.get(value.user_login)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_login[value.user_login]
+
+
+class UserCache(TTLCache[str, User]):
+    """Users by login for stateless auth, holding the ``session_epoch`` that tokens are checked against."""
+
+    def invalidate(self: Self, login: str) -> None:
+        self.pop(login)
+
+
+@dataclass(frozen=True, slots=True)
+class Audience:
+    """Who may see a user's profile and posts: everyone if public, else the user and their friends."""
+
+    is_public: bool
+    friends: frozenset[str]
+
+    def allows(self: Self, login: str, viewer_login: str) -> bool:
+        return self.is_public or viewer_login == login or viewer_login in self.friends
+
+
+class VisibilityCache(TTLCache[str, Audience]):
+    """``Audience`` of users by login.
+
+    Besides the number of users, the total size of the cached friend sets is bounded by ``max_logins``.
+    Entries are dropped by ``invalidate`` whenever a user's friend list or ``is_public`` changes.
+    """
+
+    def __init__(self: Self, maxsize: int, max_logins: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.max_logins = max_logins
+        self.logins = 0
+
+    def add(self: Self, login: str, audience: Audience) -> None:
+        if len(audience.friends) > self.max_logins:
+            return
+        self.set(login, audience)
+        if login not in self._data:
+            return
+        self.logins += len(audience.friends)
+        while self.logins > self.max_logins:
+            self.pop(next(iter(self._data)))
+
+    def invalidate(self: Self, login: str) -> None:
+        self.pop(login)
+
+    def _on_evict(self: Self, key: str, value: Audience) -> None:  # noqa: ARG002
+        self.logins -= len(value.friends)
+
+
+session_cache = SessionCache(
+    maxsize=int(getenv("SESSION_CACHE_SIZE", "10000")),
+    ttl=float(ttl) if (ttl := getenv("SESSION_CACHE_TTL")) else None,
+)
+
+user_cache = UserCache(
+    maxsize=int(getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(getenv("USER_CACHE_TTL", "30")),
+)
+
+visibility_cache = VisibilityCache(
+    maxsize=int(getenv("VISIBILITY_CACHE_SIZE", "10000")),
+    max_logins=int(getenv("VISIBILITY_CACHE_MAX_LOGINS", "1000000")),
+    ttl=float(getenv("VISIBILITY_CACHE_TTL", "60")),
+)
@@ -0,0 +1,108 @@
+__all__ = (
+    "CountryCatalogue",
+    "CountryRecord",
+    "CountrySnapshot",
+    "country_catalogue",
+)
+
+import asyncio
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from itertools import chain, combinations
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Self
+
+from litestar.serialization import encode_json
+
+from pulse_backend.schemas import CountryRegion
+
+if TYPE_CHECKING:
+    from pulse_backend.services import CountryService
+
+
+@dataclass(frozen=True, slots=True)
+class CountryRecord:
+    name: str | None
+    alpha2: str | None
+    alpha3: str | None
+    region: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class CountrySnapshot:
+    """Read-only view of the countries table with pre-encoded responses."""
+
+    by_alpha2: Mapping[str, CountryRecord]
+    by_region: Mapping[CountryRegion, tuple[CountryRecord, ...]]
+    encoded_by_alpha2: Mapping[str, bytes]
+    encoded_by_regions: Mapping[frozenset[CountryRegion], bytes]
+
+    @classmethod
+    def build(cls: type[Self], countries: Iterable[CountryRecord]) -> Self:
+        # Same order as "ORDER BY alpha2 ASC" in PostgreSQL: NULLs go last.
+        ordered = tuple(sorted(countries, key=lambda country: (country.alpha2 is None, country.alpha2 or "")))
+        by_alpha2: dict[str, CountryRecord] = {}
+        for country in ordered:
+            if country.alpha2 is not None:
+                by_alpha2.setdefault(country.alpha2, country)
+        by_region = {
+            region: tuple(country for country in ordered if country.region == region) for region in CountryRegion
+        }
+        encoded_by_regions: dict[frozenset[CountryRegion], bytes] = {frozenset(): encode_json(ordered)}
+        for regions in _region_combinations():
+            encoded_by_regions[regions] = encode_json(
+                tuple(country for country in ordered if country.region in regions)
+            )
+        return cls(
+            by_alpha2=MappingProxyType(by_alpha2),
+            by_region=MappingProxyType(by_region),
+            encoded_by_alpha2=MappingProxyType({alpha2: encode_json(c) for alpha2, c in by_alpha2.items()}),
+            encoded_by_regions=MappingProxyType(encoded_by_regions),
+        )
+
+    def exists(self: Self, alpha2: str) -> bool:
+        return alpha2 in self.by_alpha2
+
+    def encoded_list(self: Self, regions: Sequence[CountryRegion] | None) -> bytes:
+        return self.encoded_by_regions[frozenset(regions or ())]
+
+
+@dataclass(slots=True)
+class CountryCatalogue:
+    """The countries table is read once and then served from memory.
+
+    It changes only by hand; a ``countries`` invalidation (see ``pulse_backend.invalidation``) makes
+    every worker reload it on its next use.
+    """
+
+    _snapshot: CountrySnapshot | None = field(default=None, init=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
+
+    async def get(self: Self, country_service: "CountryService") -> CountrySnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            async with self._lock:
+                snapshot = self._snapshot or await self.reload(country_service)
+        return snapshot
+
+    async def reload(self: Self, country_service: "CountryService") -> CountrySnapshot:
+        countries = await country_service.list()
+        self._snapshot = CountrySnapshot.build(
+            CountryRecord(name=country.name, alpha2=country.alpha2, alpha3=country.alpha3, region=country.region)
+            for country in countries
+        )
+        return self._snapshot
+
+    def clear(self: Self) -> None:
+        self._snapshot = None
+
+
+def _region_combinations() -> Iterable[frozenset[CountryRegion]]:
+    regions = tuple(CountryRegion)
+    return (
+        frozenset(combination)
+        for combination in chain.from_iterable(combinations(regions, n) for n in range(1, len(regions) + 1))
+    )
+
+
+country_catalogue = CountryCatalogue()
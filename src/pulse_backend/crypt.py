@@ -1,10 +1,25 @@
 __all__ = (
-    "hash_password",
+    "PasswordHasher",
+    "PasswordHasherStats",
     "check_password",
+    "check_password_async",
+    "hash_password",
+    "hash_password_async",
+    "hasher",
 )
 
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from os import getenv
+from typing import Any, Literal, Self
+
 import bcrypt
 
+from pulse_backend.metrics import metrics
+
 
 def hash_password(password: str) -> bytes:
     return bcrypt.hashpw(password=_encode_password(password), salt=bcrypt.gensalt())
@@ -19,3 +34,86 @@ def check_password(password: str, hashed_password: bytes) -> bool:
 
 def _encode_password(password: str) -> bytes:
     return password.encode(encoding="utf-8")
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordHasherStats:
+    max_workers: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    completed: int
+
+
+@dataclass(slots=True)
+class PasswordHasher:
+    """Runs bcrypt in a bounded worker pool so it never blocks the event loop.
+
+    At most ``max_workers`` hashes run at the same time, the rest wait in the
+    executor queue.
+    """
+
+    kind: Literal["thread", "process"] = "thread"
+    max_workers: int = 4
+    _executor: Executor | None = field(default=None, init=False)
+    _in_flight: int = field(default=0, init=False)
+    _max_queue_depth: int = field(default=0, init=False)
+    _completed: int = field(default=0, init=False)
+
+    @property
+    def executor(self: Self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def stats(self: Self) -> PasswordHasherStats:
+        return PasswordHasherStats(
+            max_workers=self.max_workers,
+            in_flight=self._in_flight,
+            queue_depth=self._queue_depth(),
+            max_queue_depth=self._max_queue_depth,
+            completed=self._completed,
+        )
+
+    async def hash_password(self: Self, password: str) -> bytes:
+        return await self._run(hash_password, password)
+
+    async def check_password(self: Self, password: str, hashed_password: bytes) -> bool:
+        return await self._run(check_password, password, hashed_password)
+
+    def shutdown(self: Self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run[T](self: Self, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue_depth())
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            metrics.bcrypt_duration.labels(fn.__name__).observe(time.perf_counter() - start)
+
+    def _queue_depth(self: Self) -> int:
+        return max(self._in_flight - self.max_workers, 0)
+
+
+hasher = PasswordHasher(
+    kind="process" if getenv("BCRYPT_EXECUTOR") == "process" else "thread",
+    max_workers=int(getenv("BCRYPT_MAX_WORKERS", "4")),
+)
+
+
+async def hash_password_async(password: str) -> bytes:
+    return await hasher.hash_password(password)
+
+
+async def check_password_async(password: str, hashed_password: bytes) -> bool:
+    return await hasher.check_password(password, hashed_password)
@@ -0,0 +1,342 @@
+__all__ = (
+    "DatabaseSettings",
+    "InstrumentedPool",
+    "PoolMetrics",
+    "PoolStats",
+    "ReadReplicas",
+    "create_db_config",
+    "create_session_maker",
+    "is_replica_session",
+    "pool_metrics",
+)
+
+import time
+from collections.abc import AsyncGenerator, Iterator, Mapping
+from dataclasses import dataclass, field
+from itertools import cycle
+from os import environ
+from typing import Any, Self, cast
+from uuid import uuid4
+
+from advanced_alchemy.extensions.litestar import EngineConfig
+from litestar import Request
+from litestar.contrib.sqlalchemy.plugins import SQLAlchemyAsyncConfig
+from litestar.exceptions import ImproperlyConfiguredException
+from sqlalchemy import URL, make_url
+from sqlalchemy.exc import ArgumentError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from pulse_backend.cache import TTLCache
+
+_TRUE = frozenset({"1", "true", "yes", "on"})
+_FALSE = frozenset({"0", "false", "no", "off", ""})
+_STATEMENT_CACHE_VARS = ("DB_STATEMENT_CACHE_SIZE", "DB_PREPARED_STATEMENT_CACHE_SIZE")
+_REPLICA_SESSION = "pulse_replica"
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseSettings:
+    """Connection and pool settings, read from the environment once at startup."""
+
+    url: URL
+    # Defaults are those of SQLAlchemy and asyncpg.
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Seconds.
+    pool_timeout: int = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    # PgBouncer in transaction mode hands each transaction to any server connection,
+    # so statements can't stay prepared on one of them.
+    pgbouncer: bool = False
+    application_name: str = "pulse-backend"
+    # Milliseconds.
+    statement_timeout: int | None = None
+    replica_urls: tuple[URL, ...] = ()
+    # How long after a write the writer's reads still go to the primary, in seconds.
+    replica_sticky_window: float = 5
+
+    @classmethod
+    def from_env(cls: type[Self], env: Mapping[str, str] = environ) -> Self:
+        defaults = cls(url=URL.create("postgresql+asyncpg"))
+        pgbouncer = _bool(env, "DB_PGBOUNCER", default=defaults.pgbouncer)
+        if pgbouncer and any(_int(env, name, 0, minimum=0) for name in _STATEMENT_CACHE_VARS):
+            msg = f"{' and '.join(_STATEMENT_CACHE_VARS)} must be 0 or unset when DB_PGBOUNCER is on"
+            raise ImproperlyConfiguredException(msg)
+        return cls(
+            url=_url(env),
+            pool_size=_int(env, "DB_POOL_SIZE", defaults.pool_size, minimum=1),
+            max_overflow=_int(env, "DB_MAX_OVERFLOW", defaults.max_overflow, minimum=0),
+            pool_timeout=_int(env, "DB_POOL_TIMEOUT", defaults.pool_timeout, minimum=1),
+            pool_recycle=_int(env, "DB_POOL_RECYCLE", defaults.pool_recycle, minimum=-1),
+            pool_pre_ping=_bool(env, "DB_POOL_PRE_PING", default=defaults.pool_pre_ping),
+            statement_cache_size=_int(env, "DB_STATEMENT_CACHE_SIZE", defaults.statement_cache_size, minimum=0),
+            prepared_statement_cache_size=_int(
+                env, "DB_PREPARED_STATEMENT_CACHE_SIZE", defaults.prepared_statement_cache_size, minimum=0
+            ),
+            pgbouncer=pgbouncer,
+            application_name=env.get("DB_APPLICATION_NAME", defaults.application_name),
+            statement_timeout=_int(env, "DB_STATEMENT_TIMEOUT", 0, minimum=0) or None,
+            replica_urls=tuple(
+                _postgres_url("POSTGRES_REPLICA_CONN", conn.strip())
+                for conn in env.get("POSTGRES_REPLICA_CONN", "").split(",")
+                if conn.strip()
+            ),
+            replica_sticky_window=_float(env, "DB_REPLICA_STICKY_WINDOW", defaults.replica_sticky_window),
+        )
+
+    def connect_args(self: Self) -> dict[str, Any]:
+        server_settings = {"application_name": self.application_name}
+        if self.statement_timeout is not None:
+            server_settings["statement_timeout"] = str(self.statement_timeout)
+        if self.pgbouncer:
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                # Unnamed statements would clash between clients sharing a server connection.
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                "server_settings": server_settings,
+            }
+        return {
+            "statement_cache_size": self.statement_cache_size,
+            "prepared_statement_cache_size": self.prepared_statement_cache_size,
+            "server_settings": server_settings,
+        }
+
+    def engine_config(self: Self, *, instrumented: bool = True) -> EngineConfig:
+        return EngineConfig(
+            poolclass=InstrumentedPool if instrumented else AsyncAdaptedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args=self.connect_args(),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    size: int
+    checked_out: int
+    overflow: int
+    capacity: int
+    saturation: float
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_total: float
+    checkout_wait_max: float
+
+
+@dataclass(slots=True)
+class PoolMetrics:
+    """How long requests wait for a pooled connection and how close the pool is to its limit."""
+
+    checkouts: int = 0
+    checkout_timeouts: int = 0
+    checkout_wait_total: float = 0
+    checkout_wait_max: float = 0
+    pool: "InstrumentedPool | None" = field(default=None, repr=False)
+
+    def observe_checkout(self: Self, wait: float, *, timed_out: bool = False) -> None:
+        if timed_out:
+            self.checkout_timeouts += 1
+        else:
+            self.checkouts += 1
+        self.checkout_wait_total += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+
+    def stats(self: Self) -> PoolStats:
+        size = checked_out = overflow = capacity = 0
+        if self.pool is not None:
+            size = self.pool.size()
+            checked_out = self.pool.checkedout()
+            overflow = max(self.pool.overflow(), 0)
+            capacity = size + max(self.pool._max_overflow, 0)  # noqa: SLF001
+        return PoolStats(
+            size=size,
+            checked_out=checked_out,
+            overflow=overflow,
+            capacity=capacity,
+            saturation=checked_out / capacity if capacity else 0.0,
+            checkouts=self.checkouts,
+            checkout_timeouts=self.checkout_timeouts,
+            checkout_wait_total=self.checkout_wait_total,
+            checkout_wait_max=self.checkout_wait_max,
+        )
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that reports checkout waits to ``pool_metrics``."""
+
+    def __init__(self: Self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        # ``dispose()`` recreates the pool, the metrics follow the live one.
+        pool_metrics.pool = self
+
+    def _do_get(self: Self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe_checkout(time.perf_counter() - start)
+        return entry
+
+
+def create_db_config(settings: DatabaseSettings | None = None) -> SQLAlchemyAsyncConfig:
+    settings = settings or DatabaseSettings.from_env()
+    return SQLAlchemyAsyncConfig(
+        connection_string=settings.url.render_as_string(hide_password=False),
+        engine_config=settings.engine_config(),
+    )
+
+
+def create_session_maker(config: SQLAlchemyAsyncConfig) -> async_sessionmaker[AsyncSession]:
+    # The configs keep the default session maker class, which advanced-alchemy types as any callable.
+    return cast("async_sessionmaker[AsyncSession]", config.create_session_maker())
+
+
+class ReadReplicas:
+    """Routes the reads of opted-in handlers to read replicas.
+
+    Handlers opt in by depending on ``read_db_session`` instead of ``db_session``. After a user
+    sends a write request, their reads stay on the primary for ``sticky_window`` seconds so they
+    always see their own writes despite replication lag. Without replicas every read goes to the primary.
+    """
+
+    def __init__(self: Self, configs: tuple[SQLAlchemyAsyncConfig, ...], sticky_window: float) -> None:
+        self.configs = configs
+        self.session_makers: tuple[async_sessionmaker[AsyncSession], ...] = ()
+        self._next_session_maker: Iterator[async_sessionmaker[AsyncSession]] = cycle(self.session_makers)
+        # Logins of recent writers. The window is per process: a read served by another
+        # worker right after a write may still hit a lagging replica.
+        self._writers: TTLCache[str, bool] = TTLCache(maxsize=100_000, ttl=sticky_window)
+
+    @classmethod
+    def from_settings(cls: type[Self], settings: DatabaseSettings) -> Self:
+        return cls(
+            configs=tuple(
+                SQLAlchemyAsyncConfig(
+                    connection_string=url.render_as_string(hide_password=False),
+                    engine_config=settings.engine_config(instrumented=False),
+                )
+                for url in settings.replica_urls
+            ),
+            sticky_window=settings.replica_sticky_window,
+        )
+
+    def start(self: Self) -> None:
+        self.session_makers = tuple(create_session_maker(config) for config in self.configs)
+        self._next_session_maker = cycle(self.session_makers)
+
+    async def stop(self: Self) -> None:
+        for config in self.configs:
+            await config.get_engine().dispose()
+        self.session_makers = ()
+
+    def mark_writer(self: Self, request: Request[Any, Any, Any]) -> None:
+        user = request.scope.get("user")
+        if user is not None and request.method not in {"GET", "HEAD", "OPTIONS"}:
+            self._writers.set(user.login, True)  # noqa: FBT003
+
+    def is_sticky(self: Self, login: str) -> bool:
+        return login in self._writers
+
+    async def provide_session(
+        self: Self,
+        request: Request[Any, Any, Any],
+        db_session: AsyncSession,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        user = request.scope.get("user")
+        if not self.session_makers or (user is not None and self.is_sticky(user.login)):
+            yield db_session
+            return
+        async with next(self._next_session_maker)() as session:
+            session.info[_REPLICA_SESSION] = True
+            yield session
+
+
+def is_replica_session(session: AsyncSession | async_scoped_session[AsyncSession]) -> bool:
+    """Whether ``session`` reads from a replica, which may lag behind the primary."""
+    return session.info.get(_REPLICA_SESSION, False) is True
+
+
+def _url(env: Mapping[str, str]) -> URL:
+    conn = env.get("POSTGRES_CONN")
+    if not conn:
+        return URL.create(
+            drivername="postgresql+asyncpg",
+            username=env.get("POSTGRES_USERNAME", "postgres"),
+            password=env.get("POSTGRES_PASSWORD"),
+            host=env.get("POSTGRES_HOST", "localhost"),
+            port=_int(env, "POSTGRES_PORT", 5432, minimum=1),
+            database=env.get("POSTGRES_DATABASE", "postgres"),
+        )
+    return _postgres_url("POSTGRES_CONN", conn)
+
+
+def _postgres_url(name: str, conn: str) -> URL:
+    try:
+        url = make_url(conn)
+    except ArgumentError as e:
+        msg = f"{name} is not a valid database URL"
+        raise ImproperlyConfiguredException(msg) from e
+    if url.get_backend_name() not in {"postgres", "postgresql"}:
+        msg = f"{name} must point to a PostgreSQL database"
+        raise ImproperlyConfiguredException(msg)
+    url = url.set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        # libpq spelling, asyncpg takes the same modes as ``ssl``.
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.normalized_query["sslmode"][-1]})
+    return url
+
+
+def _int(env: Mapping[str, str], name: str, default: int, *, minimum: int) -> int:
+    raw = env.get(name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError as e:
+        msg = f"{name} must be an integer"
+        raise ImproperlyConfiguredException(msg) from e
+    if value < minimum:
+        msg = f"{name} must be at least {minimum}"
+        raise ImproperlyConfiguredException(msg)
+    return value
+
+
+def _float(env: Mapping[str, str], name: str, default: float) -> float:
+    raw = env.get(name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError as e:
+        msg = f"{name} must be a number"
+        raise ImproperlyConfiguredException(msg) from e
+    if value <= 0:
+        msg = f"{name} must be positive"
+        raise ImproperlyConfiguredException(msg)
+    return value
+
+
+def _bool(env: Mapping[str, str], name: str, *, default: bool) -> bool:
+    raw = env.get(name)
+    if raw is None:
+        return default
+    if raw.lower() in _TRUE:
+        return True
+    if raw.lower() in _FALSE:
+        return False
+    msg = f"{name} must be a boolean"
+    raise ImproperlyConfiguredException(msg)
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import TYPE_CHECKING
+from uuid import UUID
 
 from advanced_alchemy.base import (
     BigIntBase,
@@ -10,10 +12,17 @@ from sqlalchemy import (
     ARRAY,
     TEXT,
     TIMESTAMP,
+    Computed,
     ForeignKey,
+    Index,
+    SmallInteger,
     String,
+    func,
+    select,
+    text,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import DeclarativeBase, Mapped, column_property, mapped_column, relationship
 
 
 class Base(CommonTableAttributes, DeclarativeBase):
@@ -40,6 +49,8 @@ class User(Base):
     is_public: Mapped[bool]
     phone: Mapped[str | None] = mapped_column(String(20), unique=True)
     image: Mapped[str | None] = mapped_column(String(200))
+    # Bumped to revoke every token of the user in stateless auth mode.
+    session_epoch: Mapped[int] = mapped_column(default=0, server_default=text("0"))
 
 
 class Friend(BigIntBase):
@@ -47,6 +58,16 @@ class Friend(BigIntBase):
     login: Mapped[str] = mapped_column(ForeignKey(User.login), primary_key=True)
     addedAt: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
 
+    __table_args__ = (
+        Index("uq_friend_of_login_login", "of_login", "login", unique=True),
+        Index("ix_friend_of_login_added_at", "of_login", text('"addedAt" DESC'), "login", postgresql_include=["id"]),
+        Index("ix_friend_login", "login", "of_login"),
+    )
+
+
+# Text search configuration of ``Post.search_vector``; queries must use the same one to hit its index.
+POST_SEARCH_CONFIG = "english"
+
 
 class Post(UUIDBase):
     content: Mapped[str] = mapped_column(String(1000))
@@ -55,11 +76,89 @@ class Post(UUIDBase):
     createdAt: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
     likesCount: Mapped[int] = mapped_column(default=0)
     dislikesCount: Mapped[int] = mapped_column(default=0)
+    # Maintained by Postgres from "content". Deferred, it is only used in WHERE clauses.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR(),
+        Computed(f"to_tsvector('{POST_SEARCH_CONFIG}'::regconfig, content)", persisted=True),
+        deferred=True,
+    )
 
     user: Mapped[User] = relationship(lazy="joined")
 
+    if TYPE_CHECKING:
+        # Mapped below, after ``PostCounterShard``.
+        likesTotal: Mapped[int]
+        dislikesTotal: Mapped[int]
+
+    __table_args__ = (
+        Index("ix_post_author_created_at", "author", text('"createdAt" DESC'), text("id DESC")),
+        # Tag search: "tags && :tags" and "tags @> :tags".
+        Index("ix_post_tags", "tags", postgresql_using="gin"),
+        Index("ix_post_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class Reaction(Base):
+    """The latest reaction of a user to a post."""
+
+    post_id: Mapped[UUID] = mapped_column(ForeignKey(Post.id, ondelete="CASCADE"), primary_key=True)
+    login: Mapped[str] = mapped_column(ForeignKey(User.login), primary_key=True)
+    is_like: Mapped[bool]
+    reactedAt: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+
+
+class PostCounterShard(Base):
+    """Reaction count deltas not yet folded into ``Post``.
+
+    Writers spread over several shard rows per post instead of all updating the post row.
+    """
+
+    post_id: Mapped[UUID] = mapped_column(ForeignKey(Post.id, ondelete="CASCADE"), primary_key=True)
+    shard: Mapped[int] = mapped_column(SmallInteger(), primary_key=True)
+    likes: Mapped[int] = mapped_column(default=0)
+    dislikes: Mapped[int] = mapped_column(default=0)
+
+
+# Folded counters plus the pending deltas, i.e. the exact current counts.
+Post.likesTotal = column_property(
+    Post.likesCount
+    + select(func.coalesce(func.sum(PostCounterShard.likes), 0))
+    .where(PostCounterShard.post_id == Post.id)
+    .scalar_subquery()
+)
+Post.dislikesTotal = column_property(
+    Post.dislikesCount
+    + select(func.coalesce(func.sum(PostCounterShard.dislikes), 0))
+    .where(PostCounterShard.post_id == Post.id)
+    .scalar_subquery()
+)
+
 
 class Session(UUIDBase):
-    exp: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
-    user_login: Mapped[int] = mapped_column(ForeignKey(User.login))
+    exp: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), index=True)
+    user_login: Mapped[str] = mapped_column(ForeignKey(User.login), index=True)
     user: Mapped[User] = relationship(lazy="joined")
+
+
+class TimelineEntry(Base):
+    """A post in the materialized home timeline of ``owner_login``."""
+
+    owner_login: Mapped[str] = mapped_column(ForeignKey(User.login), primary_key=True)
+    createdAt: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+    post_id: Mapped[UUID] = mapped_column(ForeignKey(Post.id, ondelete="CASCADE"), primary_key=True)
+    author: Mapped[str] = mapped_column(String(30))
+
+
+class TagTrendBucket(Base):
+    """Posts created with ``tag`` in the ``period`` seconds (a minute or an hour) from ``start``."""
+
+    period: Mapped[int] = mapped_column(primary_key=True)
+    start: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+    tag: Mapped[str] = mapped_column(String(20), primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+class HighFanoutAuthor(Base):
+    """Authors with too many followers to fan out to; their posts are merged into timelines on read."""
+
+    login: Mapped[str] = mapped_column(ForeignKey(User.login), primary_key=True)
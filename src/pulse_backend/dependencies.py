@@ -5,7 +5,9 @@ from pulse_backend.services import (
     FriendService,
     PostService,
     SessionService,
+    TimelineService,
     UserService,
+    VisibilityService,
 )
 
 
@@ -27,3 +29,31 @@ async def provide_post_service(db_session: AsyncSession) -> PostService:
 
 async def provide_session_service(db_session: AsyncSession) -> SessionService:
     return SessionService(session=db_session, auto_commit=True)
+
+
+async def provide_visibility_service(db_session: AsyncSession) -> VisibilityService:
+    return VisibilityService(session=db_session, auto_commit=True)
+
+
+async def provide_timeline_service(db_session: AsyncSession) -> TimelineService:
+    return TimelineService(session=db_session, auto_commit=True)
+
+
+async def provide_read_country_service(read_db_session: AsyncSession) -> CountryService:
+    return CountryService(session=read_db_session, auto_commit=True)
+
+
+async def provide_read_friend_service(read_db_session: AsyncSession) -> FriendService:
+    return FriendService(session=read_db_session, auto_commit=True)
+
+
+async def provide_read_post_service(read_db_session: AsyncSession) -> PostService:
+    return PostService(session=read_db_session, auto_commit=True)
+
+
+async def provide_read_visibility_service(read_db_session: AsyncSession) -> VisibilityService:
+    return VisibilityService(session=read_db_session, auto_commit=True)
+
+
+async def provide_read_timeline_service(read_db_session: AsyncSession) -> TimelineService:
+    return TimelineService(session=read_db_session, auto_commit=True)
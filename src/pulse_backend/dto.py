@@ -2,18 +2,7 @@ from typing import Annotated
 
 from litestar.contrib.sqlalchemy.dto import SQLAlchemyDTO, SQLAlchemyDTOConfig
 
-from pulse_backend.db_models import Country, User
-
-CountryDTO = SQLAlchemyDTO[
-    Annotated[
-        Country,
-        SQLAlchemyDTOConfig(
-            exclude={
-                "id",
-            }
-        ),
-    ]
-]
+from pulse_backend.db_models import User
 
 UserDTO = SQLAlchemyDTO[
     Annotated[
@@ -21,6 +10,7 @@ UserDTO = SQLAlchemyDTO[
         SQLAlchemyDTOConfig(
             exclude={
                 "hashed_password",
+                "session_epoch",
             },
             rename_strategy="camel",
         ),
@@ -0,0 +1,125 @@
+__all__ = (
+    "CHANNEL",
+    "InvalidationListener",
+    "Kind",
+    "evict",
+    "listener",
+    "publish",
+)
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from os import getenv
+from typing import Any, Literal, Self
+
+from litestar.contrib.sqlalchemy.plugins import SQLAlchemyAsyncConfig
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_scoped_session
+
+from pulse_backend.cache import session_cache, user_cache, visibility_cache
+from pulse_backend.catalogue import country_catalogue
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pulse_invalidation"
+
+Kind = Literal["sessions", "audience", "countries"]
+
+
+def _evict_sessions(login: str) -> None:
+    session_cache.invalidate_user(login)
+    user_cache.invalidate(login)
+
+
+_EVICTORS: dict[str, Callable[[str], None]] = {
+    "sessions": _evict_sessions,
+    "audience": visibility_cache.invalidate,
+    # The whole catalogue, reloaded on its next use. Operators send it after editing the countries
+    # table with: SELECT pg_notify('pulse_invalidation', 'countries:');
+    "countries": lambda _: country_catalogue.clear(),
+}
+
+
+async def publish(session: AsyncSession | async_scoped_session[AsyncSession], kind: Kind, login: str) -> None:
+    """Tell every worker to evict ``login`` from the ``kind`` cache once the session's transaction commits.
+
+    ``NOTIFY`` is transactional: nothing is sent if the transaction rolls back. Without the listener
+    (``CACHE_INVALIDATION`` other than ``notify``) nobody would receive it, so the round trip is skipped.
+    """
+    if not listener.enabled:
+        return
+    await session.execute(select(func.pg_notify(CHANNEL, f"{kind}:{login}")))
+
+
+def evict(kind: Kind, login: str) -> None:
+    _EVICTORS[kind](login)
+
+
+def evict_all() -> None:
+    session_cache.clear()
+    user_cache.clear()
+    visibility_cache.clear()
+    country_catalogue.clear()
+
+
+@dataclass(slots=True)
+class InvalidationListener:
+    """Applies the evictions published by any worker to this worker's caches.
+
+    Holds one connection of the pool with ``LISTEN`` for as long as the app is up. While the
+    connection is down events are missed, so the caches are emptied on every (re)connect.
+    Needs a session-level connection, i.e. not one through PgBouncer in transaction mode.
+    """
+
+    enabled: bool
+    retry_interval: float = 5
+    _task: "asyncio.Task[None] | None" = field(default=None, init=False)
+
+    def start(self: Self, db_config: SQLAlchemyAsyncConfig) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(db_config.get_engine()), name="cache-invalidation")
+
+    async def stop(self: Self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self: Self, engine: AsyncEngine) -> None:
+        while True:
+            try:
+                await self._listen(engine)
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Cache invalidation listener disconnected: %s", e)
+            await asyncio.sleep(self.retry_interval)
+
+    async def _listen(self: Self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_connection = raw.driver_connection
+            if driver_connection is None:
+                msg = "The pooled connection has no asyncpg connection"
+                raise ConnectionError(msg)
+            closed = asyncio.Event()
+            driver_connection.add_termination_listener(lambda _: closed.set())
+            await driver_connection.add_listener(CHANNEL, self._on_notification)
+            try:
+                evict_all()
+                await closed.wait()
+            finally:
+                if not driver_connection.is_closed():
+                    await driver_connection.remove_listener(CHANNEL, self._on_notification)
+
+    def _on_notification(self: Self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:  # noqa: ANN401
+        kind, _, login = payload.partition(":")
+        if kind in _EVICTORS:
+            evict(kind, login)  # type: ignore[arg-type]
+        else:
+            logger.warning("Unknown cache invalidation %r", payload)
+
+
+listener = InvalidationListener(enabled=getenv("CACHE_INVALIDATION", "notify") == "notify")
@@ -0,0 +1,284 @@
+__all__ = (
+    "Histogram",
+    "HistogramFamily",
+    "Metrics",
+    "MetricsMiddleware",
+    "RequestStats",
+    "RouteTemplates",
+    "current_request_stats",
+    "instrument_sql",
+    "metrics",
+    "on_app_init",
+    "render_samples",
+)
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from litestar.config.app import AppConfig
+from litestar.enums import ScopeType
+from litestar.routes import HTTPRoute
+from litestar.types import ASGIApp, HTTPScope, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requests that matched no route are grouped together, so unknown paths do not create new series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = dict[str, str]
+
+
+@dataclass(slots=True)
+class Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    sum: float = 0
+    count: int = 0
+
+    def __post_init__(self: Self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self: Self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per combination of label values."""
+
+    def __init__(self: Self, name: str, help_: str, label_names: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.help = help_
+        self.label_names = label_names
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Histogram] = {}
+
+    def labels(self: Self, *values: str) -> Histogram:
+        histogram = self.children.get(values)
+        if histogram is None:
+            histogram = self.children[values] = Histogram(self.buckets)
+        return histogram
+
+    def render(self: Self, lines: list[str]) -> None:
+        lines.extend((f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"))
+        for values, histogram in sorted(self.children.items()):
+            labels = dict(zip(self.label_names, values, strict=True))
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram.counts, strict=True):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(labels | {'le': _number(bound)})} {cumulative}")
+            lines.extend(
+                (
+                    f"{self.name}_bucket{_labels(labels | {'le': '+Inf'})} {histogram.count}",
+                    f"{self.name}_sum{_labels(labels)} {_number(histogram.sum)}",
+                    f"{self.name}_count{_labels(labels)} {histogram.count}",
+                )
+            )
+
+
+def render_samples(lines: list[str], name: str, kind: str, help_: str, samples: Iterable[tuple[Labels, float]]) -> None:
+    """Append a counter or gauge in the Prometheus text format."""
+    lines.extend((f"# HELP {name} {help_}", f"# TYPE {name} {kind}"))
+    lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Database work done while serving the current request."""
+
+    statements: int = 0
+    db_time: float = 0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+class Metrics:
+    """Process-wide request, SQL and bcrypt metrics. Each worker process reports its own."""
+
+    def __init__(self: Self) -> None:
+        self.request_duration = HistogramFamily(
+            "pulse_http_request_duration_seconds",
+            "Time to serve a request.",
+            ("method", "route"),
+            DURATION_BUCKETS,
+        )
+        self.request_db_statements = HistogramFamily(
+            "pulse_http_request_db_statements",
+            "SQL statements executed per request.",
+            ("method", "route"),
+            STATEMENT_BUCKETS,
+        )
+        self.request_db_duration = HistogramFamily(
+            "pulse_http_request_db_duration_seconds",
+            "Time spent executing SQL statements per request.",
+            ("method", "route"),
+            DURATION_BUCKETS,
+        )
+        self.bcrypt_duration = HistogramFamily(
+            "pulse_bcrypt_duration_seconds",
+            "Time to hash or check a password, including the wait for a worker.",
+            ("operation",),
+            DURATION_BUCKETS,
+        )
+        self.responses: dict[tuple[str, str, str], int] = {}
+        self.db_statements = 0
+        self.db_time = 0.0
+
+    def observe_request(self: Self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        key = (method, route, str(status))
+        self.responses[key] = self.responses.get(key, 0) + 1
+        self.request_duration.labels(method, route).observe(duration)
+        self.request_db_statements.labels(method, route).observe(stats.statements)
+        self.request_db_duration.labels(method, route).observe(stats.db_time)
+
+    def observe_statement(self: Self, duration: float) -> None:
+        self.db_statements += 1
+        self.db_time += duration
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += duration
+
+    def render(self: Self) -> list[str]:
+        lines: list[str] = []
+        render_samples(
+            lines,
+            "pulse_http_responses_total",
+            "counter",
+            "Responses sent.",
+            (
+                ({"method": method, "route": route, "status": status}, count)
+                for (method, route, status), count in sorted(self.responses.items())
+            ),
+        )
+        for family in (self.request_duration, self.request_db_statements, self.request_db_duration):
+            family.render(lines)
+        render_samples(
+            lines, "pulse_db_statements_total", "counter", "SQL statements executed.", [({}, self.db_statements)]
+        )
+        render_samples(
+            lines,
+            "pulse_db_duration_seconds_total",
+            "counter",
+            "Time spent executing SQL statements.",
+            [({}, self.db_time)],
+        )
+        self.bcrypt_duration.render(lines)
+        return lines
+
+
+metrics = Metrics()
+
+
+class RouteTemplates:
+    """The path template of the route that served a request, ``/api/posts/{post_id}``.
+
+    The scope only records the matched route handler, so its template is looked up among the app's routes,
+    which are indexed on the first request.
+    """
+
+    def __init__(self: Self) -> None:
+        self._templates: dict[int, str] | None = None
+
+    def __call__(self: Self, scope: HTTPScope) -> str:
+        if self._templates is None:
+            self._templates = {
+                id(handler): route.path_format
+                for route in scope["app"].routes
+                if isinstance(route, HTTPRoute)
+                for handler in route.route_handlers
+            }
+        return self._templates.get(id(scope.get("route_handler")), UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """Records the latency, status and database work of every HTTP request by route template."""
+
+    def __init__(self: Self, app: ASGIApp) -> None:
+        self.app = app
+        self.route_templates = RouteTemplates()
+
+    async def __call__(self: Self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != ScopeType.HTTP:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            metrics.observe_request(
+                scope["method"], self.route_templates(scope), status, time.perf_counter() - start, stats
+            )
+
+
+_STATEMENT_STARTS = "pulse_statement_starts"
+
+
+def _before_cursor_execute(conn: Connection, *_: Any) -> None:  # noqa: ANN401
+    conn.info.setdefault(_STATEMENT_STARTS, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, *_: Any) -> None:  # noqa: ANN401
+    metrics.observe_statement(time.perf_counter() - conn.info[_STATEMENT_STARTS].pop())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    starts = context.connection.info.get(_STATEMENT_STARTS) if context.connection is not None else None
+    if starts:
+        metrics.observe_statement(time.perf_counter() - starts.pop())
+
+
+def instrument_sql() -> None:
+    """Count and time the statements of every engine, the read replicas included."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def on_app_init(app_config: AppConfig) -> AppConfig:
+    instrument_sql()
+    # Outermost, so the time spent in authentication is included.
+    app_config.middleware.insert(0, MetricsMiddleware)
+    return app_config
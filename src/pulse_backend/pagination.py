@@ -0,0 +1,161 @@
+__all__ = (
+    "FRIEND_KEYSET",
+    "NEXT_CURSOR_HEADER",
+    "POST_KEYSET",
+    "SEARCH_KEYSET",
+    "Keyset",
+    "KeysetPagination",
+    "page_response",
+)
+
+import base64
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal, Self
+from uuid import UUID
+
+from advanced_alchemy.filters import LimitOffset, OrderBy, PaginationFilter, StatementFilter
+from litestar import MediaType, Response
+from litestar.exceptions import ValidationException
+from sqlalchemy import ColumnElement, Select, and_, or_, tuple_
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortOrder = Literal["asc", "desc"]
+
+
+@dataclass
+class KeysetPagination(PaginationFilter):
+    """Seek pagination: the first ``limit`` rows strictly after ``after`` in ``order_by`` order."""
+
+    order_by: Sequence[tuple[str, SortOrder]]
+    after: Sequence[Any] | None
+    limit: int
+
+    def append_to_statement[ModelT](
+        self: Self, statement: Select[tuple[ModelT]], model: type[ModelT]
+    ) -> Select[tuple[ModelT]]:
+        if self.after is not None:
+            statement = statement.where(self._after_clause(model))
+        return statement.order_by(*self._order_by_clauses(model)).limit(self.limit)
+
+    def append_to_lambda_statement(
+        self: Self,
+        statement: StatementLambdaElement,
+        model: type[Any],
+    ) -> StatementLambdaElement:
+        if self.after is not None:
+            after_clause = self._after_clause(model)
+            statement += lambda s: s.where(after_clause)
+        order_by_clauses = self._order_by_clauses(model)
+        limit = self.limit
+        statement += lambda s: s.order_by(*order_by_clauses).limit(limit)
+        return statement
+
+    def _order_by_clauses(self: Self, model: type[Any]) -> list[ColumnElement[Any]]:
+        return [
+            field.desc() if order == "desc" else field.asc()
+            for field, order in zip(self._fields(model), (order for _, order in self.order_by), strict=True)
+        ]
+
+    def _after_clause(self: Self, model: type[Any]) -> ColumnElement[bool]:
+        fields = self._fields(model)
+        values = list(self.after or ())
+        orders = {order for _, order in self.order_by}
+        if len(orders) == 1:
+            # A row comparison is matched directly against a composite index.
+            if orders == {"desc"}:
+                return tuple_(*fields) < tuple_(*values)
+            return tuple_(*fields) > tuple_(*values)
+
+        clause: ColumnElement[bool] | None = None
+        for field, (_, order), value in reversed(list(zip(fields, self.order_by, values, strict=True))):
+            beyond = field < value if order == "desc" else field > value
+            clause = beyond if clause is None else or_(beyond, and_(field == value, clause))
+        if clause is None:
+            msg = "Keyset pagination needs at least one field"
+            raise ValueError(msg)
+        # The redundant bound on the leading field keeps the scan a single index range.
+        leading_bound = fields[0] <= values[0] if self.order_by[0][1] == "desc" else fields[0] >= values[0]
+        return and_(leading_bound, clause)
+
+    def _fields(self: Self, model: type[Any]) -> list[Any]:
+        return [self._get_instrumented_attr(model, field_name) for field_name, _ in self.order_by]
+
+
+@dataclass(frozen=True, slots=True)
+class Keyset:
+    """Sort key of a paginated listing and the codec of its opaque cursors."""
+
+    fields: tuple[tuple[str, SortOrder, Callable[[str], Any]], ...]
+
+    def filters(self: Self, limit: int, offset: int, cursor: str | None) -> list[StatementFilter]:
+        if cursor is None:
+            return [
+                *(OrderBy(field_name=field_name, sort_order=order) for field_name, order, _ in self.fields),
+                LimitOffset(limit=limit, offset=offset),
+            ]
+        return [
+            KeysetPagination(
+                order_by=[(field_name, order) for field_name, order, _ in self.fields],
+                after=self.decode(cursor),
+                limit=limit,
+            )
+        ]
+
+    def next_cursor(self: Self, rows: Sequence[Any], limit: int) -> str | None:
+        if limit == 0 or len(rows) < limit:
+            return None
+        return self.encode([getattr(rows[-1], field_name) for field_name, _, _ in self.fields])
+
+    def encode(self: Self, values: Sequence[Any]) -> str:
+        raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+    def decode(self: Self, cursor: str) -> list[Any]:
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except ValueError as e:
+            raise ValidationException("Invalid cursor") from e
+        if not isinstance(raw, list) or len(raw) != len(self.fields):
+            raise ValidationException("Invalid cursor")
+        try:
+            return [parse(value) for (_, _, parse), value in zip(self.fields, raw, strict=True)]
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ValidationException("Invalid cursor") from e
+
+
+POST_KEYSET = Keyset(
+    fields=(
+        ("createdAt", "desc", datetime.fromisoformat),
+        ("id", "desc", UUID),
+    )
+)
+
+# Full-text search results, best match first. Ties on the rank fall back to the post order.
+SEARCH_KEYSET = Keyset(
+    fields=(
+        ("rank", "desc", float),
+        ("createdAt", "desc", datetime.fromisoformat),
+        ("id", "desc", UUID),
+    )
+)
+
+FRIEND_KEYSET = Keyset(
+    fields=(
+        ("addedAt", "desc", datetime.fromisoformat),
+        ("login", "asc", str),
+    )
+)
+
+
+def page_response[T](content: T, next_cursor: str | None) -> Response[T]:
+    """Respond with a page of a listing; ``content`` may be JSON that is already encoded."""
+    return Response(
+        content,
+        media_type=MediaType.JSON,
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor is not None else None,
+    )
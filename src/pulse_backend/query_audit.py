@@ -0,0 +1,214 @@
+__all__ = (
+    "QueryAudit",
+    "QueryAuditMiddleware",
+    "QueryReport",
+    "SlowQuery",
+    "audit",
+)
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from os import getenv
+from typing import Any, Literal, Self
+
+from litestar.config.app import AppConfig
+from litestar.enums import ScopeType
+from litestar.exceptions import ImproperlyConfiguredException
+from litestar.middleware import DefineMiddleware
+from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.types import ASGIApp, HTTPResponseBodyEvent, HTTPResponseStartEvent, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+from pulse_backend.metrics import RouteTemplates
+
+logger = logging.getLogger(__name__)
+
+# Statements that Postgres can ``EXPLAIN`` without side effects on the transaction.
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    statement: str
+    duration: float
+    plan: list[str]
+
+
+@dataclass(slots=True)
+class QueryReport:
+    """Statements executed while serving one request, by SQL text."""
+
+    slow_threshold: float
+    statements: Counter[str] = field(default_factory=Counter)
+    slow: list[SlowQuery] = field(default_factory=list)
+
+    @property
+    def count(self: Self) -> int:
+        return self.statements.total()
+
+    def repeated(self: Self, threshold: int) -> dict[str, int]:
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+
+_report: ContextVar[QueryReport | None] = ContextVar("query_report", default=None)
+
+Mode = Literal["off", "warn", "strict"]
+
+
+@dataclass(slots=True)
+class QueryAudit:
+    """Opt-in audit of the SQL each request issues, for development and CI.
+
+    Handlers declare a budget with ``opt={"query_budget": n}``. A request over its budget is logged
+    in ``warn`` mode and answered with a 500 error in ``strict`` mode, which fails tests. The same statement
+    executed ``repeat_threshold`` times in one request is logged as a likely N+1, and statements slower
+    than ``slow_threshold`` seconds are logged with their ``EXPLAIN`` plan.
+    """
+
+    mode: Mode = "off"
+    slow_threshold: float = 0.1
+    repeat_threshold: int = 3
+
+    @property
+    def enabled(self: Self) -> bool:
+        return self.mode != "off"
+
+    def on_app_init(self: Self, app_config: AppConfig) -> AppConfig:
+        if self.enabled:
+            if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+                event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+                event.listen(Engine, "handle_error", _handle_error)
+            app_config.middleware.insert(0, DefineMiddleware(QueryAuditMiddleware, audit=self))
+        return app_config
+
+    def check(self: Self, route: str, budget: int | None, report: QueryReport) -> str | None:
+        """Log the findings of ``report``, return the error if the request to ``route`` is over its budget."""
+        for slow in report.slow:
+            logger.warning(
+                "Slow query (%.1f ms) in %s: %s\n%s", slow.duration * 1000, route, slow.statement, "\n".join(slow.plan)
+            )
+        for statement, count in report.repeated(self.repeat_threshold).items():
+            logger.warning("Possible N+1 in %s, executed %d times: %s", route, count, statement)
+
+        if budget is None or report.count <= budget:
+            return None
+        msg = f"{route} executed {report.count} queries, its budget is {budget}"
+        logger.warning(msg)
+        return msg
+
+
+class QueryAuditMiddleware:
+    def __init__(self: Self, app: ASGIApp, audit: QueryAudit) -> None:
+        self.app = app
+        self.audit = audit
+        self.route_templates = RouteTemplates()
+
+    async def __call__(self: Self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != ScopeType.HTTP:
+            await self.app(scope, receive, send)
+            return
+
+        report = QueryReport(slow_threshold=self.audit.slow_threshold)
+        failed = False
+
+        # Checked when the response starts, so that in strict mode the response can still be replaced.
+        async def send_wrapper(message: Message) -> None:
+            nonlocal failed
+            if message["type"] == "http.response.start":
+                handler = scope.get("route_handler")
+                error = self.audit.check(
+                    f"{scope['method']} {self.route_templates(scope)}",
+                    handler.opt.get("query_budget") if handler is not None else None,
+                    report,
+                )
+                if error is not None and self.audit.mode == "strict":
+                    failed = True
+                    start: HTTPResponseStartEvent = {
+                        "type": "http.response.start",
+                        "status": HTTP_500_INTERNAL_SERVER_ERROR,
+                        "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+                    }
+                    body: HTTPResponseBodyEvent = {
+                        "type": "http.response.body",
+                        "body": f"Query budget exceeded: {error}".encode(),
+                        "more_body": False,
+                    }
+                    await send(start)
+                    await send(body)
+            if not failed:
+                await send(message)
+
+        token = _report.set(report)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _report.reset(token)
+
+
+_STATEMENT_STARTS = "pulse_audit_statement_starts"
+
+
+def _before_cursor_execute(conn: Connection, *_: Any) -> None:  # noqa: ANN401
+    if _report.get() is not None:
+        conn.info.setdefault(_STATEMENT_STARTS, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    _cursor: Any,  # noqa: ANN401
+    statement: str,
+    parameters: Any,  # noqa: ANN401
+    _context: Any,  # noqa: ANN401
+    executemany: bool,  # noqa: FBT001
+) -> None:
+    report = _report.get()
+    starts = conn.info.get(_STATEMENT_STARTS)
+    if report is None or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    report.statements[statement] += 1
+    if duration >= report.slow_threshold:
+        plan = [] if executemany else _explain(conn, statement, parameters)
+        report.slow.append(SlowQuery(statement=statement, duration=duration, plan=plan))
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    starts = context.connection.info.get(_STATEMENT_STARTS) if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _explain(conn: Connection, statement: str, parameters: Any) -> list[str]:  # noqa: ANN401
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    # A raw DBAPI cursor: the plan query is neither audited nor mixed into the statement's result.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return [row[0] for row in cursor.fetchall()]
+    except Exception:
+        logger.exception("Could not EXPLAIN %s", statement)
+        return []
+    finally:
+        cursor.close()
+
+
+def _mode(value: str) -> Mode:
+    match value:
+        case "off" | "warn" | "strict":
+            return value
+        case _:
+            msg = f"QUERY_AUDIT must be off, warn or strict, not {value!r}"
+            raise ImproperlyConfiguredException(msg)
+
+
+audit = QueryAudit(
+    mode=_mode(getenv("QUERY_AUDIT", "off")),
+    slow_threshold=float(getenv("QUERY_AUDIT_SLOW_MS", "100")) / 1000,
+    repeat_threshold=int(getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "3")),
+)
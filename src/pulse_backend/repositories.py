@@ -1,6 +1,6 @@
 from litestar.contrib.sqlalchemy.repository import SQLAlchemyAsyncRepository
 
-from pulse_backend.db_models import Country, Friend, Post, Session, User
+from pulse_backend.db_models import Country, Friend, Post, Session, TimelineEntry, User
 
 
 class CountryRepository(SQLAlchemyAsyncRepository[Country]):
@@ -22,3 +22,7 @@ class PostRepository(SQLAlchemyAsyncRepository[Post]):
 
 class SessionRepository(SQLAlchemyAsyncRepository[Session]):
     model_type = Session
+
+
+class TimelineRepository(SQLAlchemyAsyncRepository[TimelineEntry]):
+    model_type = TimelineEntry
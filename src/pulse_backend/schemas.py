@@ -68,6 +68,23 @@ class AddFriend(BaseModel):
     login: Annotated[str, Field(max_length=30, pattern=r"[a-zA-Z0-9-]+")]
 
 
+MAX_FRIENDS_BATCH = 1000
+
+
+class FriendsBatch(BaseModel):
+    logins: Annotated[
+        list[Annotated[str, Field(max_length=30, pattern=r"[a-zA-Z0-9-]+")]],
+        Field(min_length=1, max_length=MAX_FRIENDS_BATCH),
+    ]
+
+
 class CreatePost(BaseModel):
     content: Annotated[str, Field(max_length=1000)]
     tags: list[str]
+
+
+MAX_POSTS_BATCH = 100
+
+
+class CreatePosts(BaseModel):
+    posts: Annotated[list[CreatePost], Field(min_length=1, max_length=MAX_POSTS_BATCH)]
@@ -1,23 +1,95 @@
-from typing import Any, Self
+import random
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Self, cast
+from uuid import UUID
 
 from advanced_alchemy.service import SQLAlchemyAsyncRepositoryService
 from litestar.exceptions import NotAuthorizedException, PermissionDeniedException
-from sqlalchemy import delete
+from sqlalchemy import (
+    ARRAY,
+    TIMESTAMP,
+    ColumnElement,
+    Select,
+    String,
+    Uuid,
+    and_,
+    any_,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert
+from sqlalchemy.orm import aliased
 
-from pulse_backend.crypt import check_password, hash_password
-from pulse_backend.db_models import Country, Friend, Post, Session, User
+from pulse_backend.cache import Audience, visibility_cache
+from pulse_backend.catalogue import CountrySnapshot, country_catalogue
+from pulse_backend.crypt import check_password_async, hash_password_async
+from pulse_backend.database import is_replica_session
+from pulse_backend.db_models import (
+    POST_SEARCH_CONFIG,
+    Country,
+    Friend,
+    HighFanoutAuthor,
+    Post,
+    PostCounterShard,
+    Reaction,
+    Session,
+    TagTrendBucket,
+    TimelineEntry,
+    User,
+)
+from pulse_backend.invalidation import evict, publish
+from pulse_backend.pagination import POST_KEYSET, SEARCH_KEYSET
 from pulse_backend.repositories import (
     CountryRepository,
     FriendRepository,
     PostRepository,
     SessionRepository,
+    TimelineRepository,
     UserRepository,
 )
+from pulse_backend.views import PostView, TagTrend, post_view, post_view_columns
+
+# Daily partitions of "session" when it is partitioned by expiry, see the session_expiry migration.
+SESSION_PARTITION_PREFIX = "session_p"
+
+
+@dataclass(frozen=True, slots=True)
+class TrendingWindow:
+    """Tags ranked by their posts in the last ``span``, counted per ``period``, worth half every ``half_life``."""
+
+    span: timedelta
+    period: timedelta
+    half_life: timedelta
+
+
+MINUTE = timedelta(minutes=1)
+HOUR = timedelta(hours=1)
+TRENDING_WINDOWS = {
+    "1h": TrendingWindow(span=HOUR, period=MINUTE, half_life=timedelta(minutes=20)),
+    "24h": TrendingWindow(span=timedelta(hours=24), period=HOUR, half_life=timedelta(hours=6)),
+}
 
 
 class CountryService(SQLAlchemyAsyncRepositoryService[Country]):
     repository_type = CountryRepository
 
+    async def catalogue(self: Self) -> CountrySnapshot:
+        return await country_catalogue.get(self)
+
 
 class UserService(SQLAlchemyAsyncRepositoryService[User]):
     repository_type = UserRepository
@@ -26,33 +98,739 @@ class UserService(SQLAlchemyAsyncRepositoryService[User]):
         if isinstance(data, dict):
             password = data.pop("password", None)
             if isinstance(password, str):
-                data["hashed_password"] = hash_password(password)
+                data["hashed_password"] = await hash_password_async(password)
         return await super().to_model(data=data, operation=operation)
 
     async def authentication(self: Self, login: str, password: str) -> User:
         user = await self.get_one_or_none(login=login)
-        if user is None or not check_password(password, user.hashed_password):
+        if user is None or not await check_password_async(password, user.hashed_password):
             raise NotAuthorizedException("Invalid login or password")
         return user
 
     async def update_password(self: Self, user: User, old_password: str, new_password: str) -> User:
-        if not check_password(old_password, user.hashed_password):
+        if not await check_password_async(old_password, user.hashed_password):
             raise PermissionDeniedException("Invalid password")
-        user.hashed_password = hash_password(new_password)
-        return await self.update(user)
+        hashed_password = await hash_password_async(new_password)
+        await publish(self.repository.session, "sessions", user.login)
+        # Only the hash: ``user`` is the request's detached copy, whose other columns may be stale,
+        # e.g. ``session_epoch`` once the sessions have been deactivated.
+        await self.repository.session.execute(
+            update(User).where(User.login == user.login).values(hashed_password=hashed_password),
+            execution_options={"synchronize_session": False},
+        )
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        evict("sessions", user.login)
+        user.hashed_password = hashed_password
+        return user
+
+    async def update_profile(self: Self, login: str, data: dict[str, Any]) -> User:
+        session = self.repository.session
+        await publish(session, "sessions", login)
+        await publish(session, "audience", login)
+        user = await self.update(data, item_id=login)
+        evict("sessions", login)
+        evict("audience", login)
+        return user
 
 
 class FriendService(SQLAlchemyAsyncRepositoryService[Friend]):
     repository_type = FriendRepository
 
+    async def add(self: Self, of_login: str, login: str) -> None:
+        await publish(self.repository.session, "audience", of_login)
+        await self.upsert(
+            Friend(of_login=of_login, login=login, addedAt=datetime.now(UTC)),
+            match_fields=["of_login", "login"],
+        )
+        evict("audience", of_login)
+
+    async def remove(self: Self, of_login: str, login: str) -> None:
+        await publish(self.repository.session, "audience", of_login)
+        await self.repository.session.execute(delete(Friend).where(Friend.of_login == of_login, Friend.login == login))
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        evict("audience", of_login)
+
+    async def add_many(self: Self, of_login: str, logins: Sequence[str]) -> list[str]:
+        """Add the existing users among ``logins`` as friends in one statement and return their logins."""
+        await publish(self.repository.session, "audience", of_login)
+        existing = select(
+            User.login,
+            literal(of_login),
+            literal(datetime.now(UTC), TIMESTAMP(timezone=True)),
+        ).where(User.login == any_(_logins_array(logins)), User.login != of_login)
+        upsert = insert(Friend).from_select(["login", "of_login", "addedAt"], existing)
+        stmt = upsert.on_conflict_do_update(
+            index_elements=[Friend.of_login, Friend.login],
+            set_={"addedAt": upsert.excluded.addedAt},
+        ).returning(Friend.login)
+        added = list((await self.repository.session.scalars(stmt)).all())
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        evict("audience", of_login)
+        return added
+
+    async def remove_many(self: Self, of_login: str, logins: Sequence[str]) -> list[str]:
+        """Remove ``logins`` from the friends in one statement and return the ones that were friends."""
+        await publish(self.repository.session, "audience", of_login)
+        stmt = (
+            delete(Friend)
+            .where(Friend.of_login == of_login, Friend.login == any_(_logins_array(logins)))
+            .returning(Friend.login)
+        )
+        removed = list((await self.repository.session.scalars(stmt)).all())
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        evict("audience", of_login)
+        return removed
+
 
 class PostService(SQLAlchemyAsyncRepositoryService[Post]):
     repository_type = PostRepository
 
+    counter_shards = 16
+
+    async def list_by_author(
+        self: Self,
+        author: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> list[PostView]:
+        stmt = _author_posts(author, limit=limit, offset=offset, cursor=cursor)
+        return [post_view(row) for row in await self.repository.session.execute(stmt)]
+
+    async def insert_many(self: Self, posts: Sequence[Post]) -> list[PostView]:
+        """Insert ``posts`` with one multi-row ``INSERT`` and return them in the same order."""
+        stmt = (
+            insert(Post)
+            .values(
+                [
+                    {
+                        "id": post.id,
+                        "content": post.content,
+                        "author": post.author,
+                        "tags": post.tags,
+                        "createdAt": post.createdAt,
+                    }
+                    for post in posts
+                ]
+            )
+            .returning(Post.id, Post.content, Post.author, Post.tags, Post.createdAt)
+        )
+        # New posts have no reactions yet, and the computed totals would not correlate in RETURNING.
+        by_id = {
+            row.id: PostView(**row._mapping, likesCount=0, dislikesCount=0)  # noqa: SLF001
+            for row in await self.repository.session.execute(stmt)
+        }
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        return [by_id[post.id] for post in posts]
+
+    async def react(self: Self, post_id: UUID, login: str, *, is_like: bool) -> PostView:
+        """Record the user's latest reaction and return the post with updated counts."""
+        session = self.repository.session
+        reacted_at = datetime.now(UTC)
+        inserted = await session.scalar(
+            insert(Reaction)
+            .values(post_id=post_id, login=login, is_like=is_like, reactedAt=reacted_at)
+            .on_conflict_do_nothing(index_elements=[Reaction.post_id, Reaction.login])
+            .returning(Reaction.is_like)
+        )
+        was_like: bool | None = None
+        if inserted is None:
+            # An existing reaction. Locked before it is read, so that concurrent reactions of the user
+            # apply one after the other, each against the value the previous one committed.
+            reaction = Reaction.post_id == post_id, Reaction.login == login
+            was_like = await session.scalar(select(Reaction.is_like).where(*reaction).with_for_update())
+            await session.execute(
+                update(Reaction).where(*reaction).values(is_like=is_like, reactedAt=reacted_at),
+                execution_options={"synchronize_session": False},
+            )
+
+        likes = int(is_like) - int(was_like is True)
+        dislikes = int(not is_like) - int(was_like is False)
+        if likes or dislikes:
+            await self._add_to_counters(post_id, likes=likes, dislikes=dislikes)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        row = (await self.repository.session.execute(select(*post_view_columns()).where(Post.id == post_id))).one()
+        return post_view(row)
+
+    async def fold_counters(self: Self, batch_size: int = 1000) -> int:
+        """Move pending counter deltas into ``Post`` and return how many shard rows were folded."""
+        batch = (
+            select(PostCounterShard.post_id, PostCounterShard.shard).limit(batch_size).with_for_update(skip_locked=True)
+        )
+        folded = (
+            delete(PostCounterShard)
+            .where(tuple_(PostCounterShard.post_id, PostCounterShard.shard).in_(batch))
+            .returning(PostCounterShard.post_id, PostCounterShard.likes, PostCounterShard.dislikes)
+            .cte("folded")
+        )
+        totals = (
+            select(
+                folded.c.post_id,
+                func.sum(folded.c.likes).label("likes"),
+                func.sum(folded.c.dislikes).label("dislikes"),
+                func.count().label("shards"),
+            )
+            .group_by(folded.c.post_id)
+            .cte("totals")
+        )
+        stmt = (
+            update(Post)
+            .where(Post.id == totals.c.post_id)
+            .values(likesCount=Post.likesCount + totals.c.likes, dislikesCount=Post.dislikesCount + totals.c.dislikes)
+            .returning(totals.c.shards)
+        )
+        result = await self.repository.session.execute(stmt, execution_options={"synchronize_session": False})
+        folded_shards: int = sum(result.scalars())
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        return folded_shards
+
+    async def add_tag_counts(self: Self, counts: Mapping[tuple[datetime, str], int]) -> None:
+        """Add posts per (minute, tag) to the minute and hour buckets of the trending tags, in one statement."""
+        buckets: Counter[tuple[int, datetime, str]] = Counter()
+        for (start, tag), count in counts.items():
+            buckets[int(MINUTE.total_seconds()), start, tag] += count
+            buckets[int(HOUR.total_seconds()), start.replace(minute=0), tag] += count
+        # Sorted, so that workers adding to the same buckets lock them in the same order.
+        rows = [
+            {"period": period, "start": start, "tag": tag, "count": count}
+            for (period, start, tag), count in sorted(buckets.items())
+        ]
+        stmt = insert(TagTrendBucket).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TagTrendBucket.period, TagTrendBucket.start, TagTrendBucket.tag],
+            set_={"count": TagTrendBucket.count + stmt.excluded.count},
+        )
+        await self.repository.session.execute(stmt)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+
+    async def prune_tag_buckets(self: Self, now: datetime) -> None:
+        """Delete the trending tag buckets that no window covers anymore."""
+        stmt = delete(TagTrendBucket).where(
+            or_(
+                *(
+                    and_(
+                        TagTrendBucket.period == int(window.period.total_seconds()),
+                        TagTrendBucket.start <= now - window.span - window.period,
+                    )
+                    for window in TRENDING_WINDOWS.values()
+                )
+            )
+        )
+        await self.repository.session.execute(stmt)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+
+    async def trending_tags(self: Self, window: TrendingWindow, now: datetime, limit: int) -> list[TagTrend]:
+        """Return the ``limit`` tags with the highest decayed post counts in ``window``.
+
+        Reads at most one bucket per tag and ``window.period`` in ``window.span``, e.g. 24 rows per tag for a day.
+        """
+        period = int(window.period.total_seconds())
+        # Seconds from the middle of the bucket to now.
+        age = func.extract("epoch", literal(now, TIMESTAMP(timezone=True)) - TagTrendBucket.start) - period / 2
+        score = func.sum(TagTrendBucket.count * func.power(0.5, age / window.half_life.total_seconds())).label("score")
+        stmt = (
+            select(TagTrendBucket.tag, score, func.sum(TagTrendBucket.count))
+            .where(TagTrendBucket.period == period, TagTrendBucket.start > now - window.span)
+            .group_by(TagTrendBucket.tag)
+            .order_by(score.desc(), TagTrendBucket.tag)
+            .limit(limit)
+        )
+        return [
+            TagTrend(tag=tag, score=float(score_), posts=int(posts))
+            for tag, score_, posts in await self.repository.session.execute(stmt)
+        ]
+
+    async def _add_to_counters(self: Self, post_id: UUID, *, likes: int, dislikes: int) -> None:
+        stmt = insert(PostCounterShard).values(
+            post_id=post_id,
+            shard=random.randrange(self.counter_shards),  # noqa: S311
+            likes=likes,
+            dislikes=dislikes,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostCounterShard.post_id, PostCounterShard.shard],
+            set_={
+                "likes": PostCounterShard.likes + stmt.excluded.likes,
+                "dislikes": PostCounterShard.dislikes + stmt.excluded.dislikes,
+            },
+        )
+        await self.repository.session.execute(stmt)
+
 
 class SessionService(SQLAlchemyAsyncRepositoryService[Session]):
     repository_type = SessionRepository
 
     async def deactivate(self: Self, user_login: str) -> None:
+        await publish(self.repository.session, "sessions", user_login)
         await self.repository.session.execute(delete(Session).where(Session.user_login == user_login))
+        await self.repository.session.execute(
+            update(User).where(User.login == user_login).values(session_epoch=User.session_epoch + 1),
+            execution_options={"synchronize_session": False},
+        )
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        evict("sessions", user_login)
+
+    async def reap_expired(self: Self, batch_size: int = 1000, max_batches: int = 100) -> int:
+        """Delete expired sessions and return how many were deleted.
+
+        Each batch is its own short transaction and skips rows locked by others,
+        so sign-ins and the auth lookup never wait for the reaper.
+        """
+        batch = (
+            select(Session.id)
+            .where(Session.exp < func.now())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = delete(Session).where(Session.id.in_(batch))
+        deleted = 0
+        for _ in range(max_batches):
+            result = await self.repository.session.execute(stmt, execution_options={"synchronize_session": False})
+            await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        return deleted
+
+    async def maintain_partitions(self: Self, days_ahead: int = 2) -> int:
+        """Create upcoming daily partitions and drop expired ones if ``session`` is partitioned by ``exp``.
+
+        Returns how many partitions were dropped. Does nothing for an unpartitioned table.
+        """
+        session = self.repository.session
+        relkind = await session.scalar(text("SELECT relkind FROM pg_class WHERE oid = 'session'::regclass"))
+        if relkind != "p":
+            return 0
+        today = datetime.now(UTC).date()
+        partitions = await session.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'session'::regclass"
+            )
+        )
+        dropped = 0
+        for name in partitions.all():
+            day = _session_partition_day(name)
+            # Every session in the partition of ``day`` expired by the end of that day.
+            if day is not None and day < today:
+                await session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                dropped += 1
+        # Today's sessions may already sit in the default partition, so only later days are created.
+        for days in range(1, days_ahead + 1):
+            day = today + timedelta(days=days)
+            await session.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{SESSION_PARTITION_PREFIX}{day:%Y%m%d}" PARTITION OF session '
+                    f"FOR VALUES FROM ('{day} 00:00+00') TO ('{day + timedelta(days=1)} 00:00+00')"
+                )
+            )
         await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        return dropped
+
+
+class VisibilityService(SQLAlchemyAsyncRepositoryService[User]):
+    """Loads users and posts together with whether the viewer may see them.
+
+    A user's profile and posts are visible to everyone if the user is public,
+    otherwise only to the user and to those they added as friends. Single lookups
+    check this against the cached ``Audience`` of the author, listings over many
+    authors check it in SQL with ``visible_to``.
+    """
+
+    repository_type = UserRepository
+
+    @staticmethod
+    def visible_to(viewer_login: str) -> ColumnElement[bool]:
+        # Aliased so that the subquery is never correlated to a "friend" table of the enclosing query.
+        friend = aliased(Friend)
+        return or_(
+            User.is_public.is_(True),
+            User.login == viewer_login,
+            exists().where(friend.of_login == User.login, friend.login == viewer_login),
+        )
+
+    async def audience(self: Self, login: str) -> Audience | None:
+        """Return who may see the user's profile and posts, or ``None`` if there is no such user."""
+        audience = visibility_cache.get(login)
+        if audience is not None:
+            return audience
+        stmt = (
+            select(User.is_public, func.array_remove(func.array_agg(Friend.login), None))
+            .select_from(User)
+            .outerjoin(Friend, Friend.of_login == User.login)
+            .where(User.login == login)
+            .group_by(User.login)
+        )
+        row = (await self.repository.session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        audience = Audience(is_public=row[0] is True, friends=frozenset(row[1]))
+        self._cache_audience(login, audience)
+        return audience
+
+    async def get_user(self: Self, login: str, viewer_login: str) -> tuple[User | None, bool]:
+        session = self.repository.session
+        audience = visibility_cache.get(login)
+        if audience is not None:
+            user = await session.scalar(select(User).where(User.login == login))
+            return user, user is not None and audience.allows(login, viewer_login)
+        # On a miss the user comes with their friends, still one query, and their audience is cached.
+        friends = select(func.array_agg(Friend.login)).where(Friend.of_login == User.login).scalar_subquery()
+        row = (await session.execute(select(User, friends).where(User.login == login))).one_or_none()
+        if row is None:
+            return None, False
+        user, friend_logins = row
+        audience = Audience(is_public=user.is_public is True, friends=frozenset(friend_logins or ()))
+        self._cache_audience(login, audience)
+        return user, audience.allows(login, viewer_login)
+
+    def _cache_audience(self: Self, login: str, audience: Audience) -> None:
+        # A lagging replica can still return the audience an invalidation just dropped, cached it would
+        # outlive the unfriending or the switch to private for the whole TTL.
+        if not is_replica_session(self.repository.session):
+            visibility_cache.add(login, audience)
+
+    async def get_post(self: Self, post_id: UUID, viewer_login: str) -> tuple[PostView | None, bool]:
+        row = (
+            await self.repository.session.execute(select(*post_view_columns()).where(Post.id == post_id))
+        ).one_or_none()
+        if row is None:
+            return None, False
+        post = post_view(row)
+        audience = await self.audience(post.author)
+        return post, audience is not None and audience.allows(post.author, viewer_login)
+
+    async def get_posts(self: Self, post_ids: Sequence[UUID], viewer_login: str) -> dict[UUID, tuple[PostView, bool]]:
+        """Load the existing posts among ``post_ids`` and whether the viewer may see each, in one query."""
+        stmt = (
+            select(*post_view_columns(), self.visible_to(viewer_login).label("visible"))
+            .join(User, User.login == Post.author)
+            .where(Post.id == any_(literal(list(post_ids), ARRAY(Uuid()))))
+        )
+        return {row.id: (post_view(row), row.visible) for row in await self.repository.session.execute(stmt)}
+
+    async def list_posts(
+        self: Self,
+        author: str,
+        viewer_login: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> tuple[str | None, bool, list[PostView]]:
+        audience = await self.audience(author)
+        if audience is None:
+            return None, False, []
+        if not audience.allows(author, viewer_login):
+            return author, False, []
+        stmt = _author_posts(author, limit=limit, offset=offset, cursor=cursor)
+        return author, True, [post_view(row) for row in await self.repository.session.execute(stmt)]
+
+    async def search_by_tags(  # noqa: PLR0913
+        self: Self,
+        tags: Sequence[str],
+        viewer_login: str,
+        *,
+        match_all: bool = False,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> list[PostView]:
+        """Return the latest posts visible to the viewer tagged with any (or, with ``match_all``, all) of ``tags``.
+
+        The tag condition is answered by the GIN index on ``post.tags``.
+        """
+        tags_array = literal(list(tags), ARRAY(String(20)))
+        has_tags = Post.tags.op("@>" if match_all else "&&", is_comparison=True)(tags_array)
+        stmt = (
+            select(*post_view_columns())
+            .join(User, User.login == Post.author)
+            .where(has_tags, self.visible_to(viewer_login))
+        )
+        for filter_ in POST_KEYSET.filters(limit=limit, offset=offset, cursor=cursor):
+            stmt = filter_.append_to_statement(stmt, Post)
+        return [post_view(row) for row in await self.repository.session.execute(stmt)]
+
+    async def search_text(
+        self: Self,
+        text: str,
+        viewer_login: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> list[tuple[PostView, float]]:
+        """Return the posts visible to the viewer whose content matches ``text``, with their rank, best first.
+
+        ``text`` is parsed by ``websearch_to_tsquery``, so any user input is a valid query: words,
+        ``"quoted phrases"``, ``or`` and ``-excluded`` words. Matches are found with the GIN index on
+        ``post.search_vector``. Only the requested page is joined back to the posts for the view columns,
+        so the reaction totals are not computed for every match.
+        """
+        query = func.websearch_to_tsquery(literal(POST_SEARCH_CONFIG, REGCONFIG), text)
+        matches = (
+            select(Post.id, Post.createdAt, func.ts_rank_cd(Post.search_vector, query).label("rank"))
+            .join(User, User.login == Post.author)
+            .where(Post.search_vector.bool_op("@@")(query), self.visible_to(viewer_login))
+            .subquery("matches")
+        )
+        page_stmt = select(matches)
+        # The filters only look the sort fields up by name, which the subquery's columns support.
+        columns = cast("type[Any]", matches.c)
+        for filter_ in SEARCH_KEYSET.filters(limit=limit, offset=offset, cursor=cursor):
+            page_stmt = filter_.append_to_statement(page_stmt, columns)
+        page = page_stmt.subquery("page")
+        stmt = (
+            select(*post_view_columns(), page.c.rank)
+            .join(page, page.c.id == Post.id)
+            .order_by(page.c.rank.desc(), page.c.createdAt.desc(), page.c.id.desc())
+        )
+        return [(post_view(row), row.rank) for row in await self.repository.session.execute(stmt)]
+
+    async def list_friends_posts(
+        self: Self,
+        viewer_login: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> list[PostView]:
+        """Merge the latest visible posts of everyone in the viewer's friend list.
+
+        Each friend contributes at most one page of posts, read from the (author, createdAt, id)
+        index, and the outer query merges those sorted runs into the requested page.
+        """
+        if cursor is not None:
+            offset = 0
+        # Only table columns here, the computed reaction totals are evaluated for the merged page alone.
+        posts_stmt = select(*_post_table_columns()).where(Post.author == Friend.login)
+        for filter_ in POST_KEYSET.filters(limit=limit + offset, offset=0, cursor=cursor):
+            posts_stmt = filter_.append_to_statement(posts_stmt, Post)
+        posts_subquery = posts_stmt.lateral()
+        post_alias = aliased(Post, posts_subquery)
+        stmt = (
+            select(*post_view_columns(post_alias))
+            .select_from(Friend)
+            .join(User, User.login == Friend.login)
+            .join(post_alias, true())
+            .where(Friend.of_login == viewer_login, self.visible_to(viewer_login))
+        )
+        for filter_ in POST_KEYSET.filters(limit=limit, offset=offset, cursor=None):
+            stmt = filter_.append_to_statement(stmt, post_alias)
+        return [post_view(row) for row in await self.repository.session.execute(stmt)]
+
+
+class TimelineService(SQLAlchemyAsyncRepositoryService[TimelineEntry]):
+    """Materialized home timelines: posts are copied into the timelines of the author's followers on write.
+
+    Authors followed by more than ``max_followers`` users are marked as high-fanout and skipped;
+    their posts are merged into the home timeline on read instead.
+    """
+
+    repository_type = TimelineRepository
+
+    backfill_size = 200
+
+    async def fan_out(self: Self, posts: Sequence[Post], max_followers: int) -> int:
+        """Append ``posts`` to their authors' followers' timelines and return how many entries were added."""
+        by_author: dict[str, list[Post]] = {}
+        for post in posts:
+            by_author.setdefault(post.author, []).append(post)
+
+        added = 0
+        for author, author_posts in by_author.items():
+            if await self._is_high_fanout(author, max_followers):
+                continue
+            new_posts = values(
+                column("post_id", Uuid()),
+                column("createdAt", TIMESTAMP(timezone=True)),
+                name="new_post",
+            ).data([(post.id, post.createdAt) for post in author_posts])
+            followers = (
+                select(Friend.of_login, new_posts.c.createdAt, new_posts.c.post_id, literal(author))
+                .select_from(Friend)
+                .join(new_posts, true())
+                .where(Friend.login == author)
+            )
+            added += await self._insert_entries(followers)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+        return added
+
+    async def follow(self: Self, owner_login: str, author: str) -> None:
+        """Backfill the owner's timeline with the latest posts of a newly added friend."""
+        high_fanout = await self.repository.session.scalar(
+            select(exists().where(HighFanoutAuthor.login == author)),
+        )
+        if not high_fanout:
+            latest = (
+                select(literal(owner_login), Post.createdAt, Post.id, Post.author)
+                .where(Post.author == author)
+                .order_by(Post.createdAt.desc(), Post.id.desc())
+                .limit(self.backfill_size)
+            )
+            await self._insert_entries(latest)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+
+    async def follow_many(self: Self, owner_login: str, authors: Sequence[str]) -> None:
+        """``follow`` every author in one statement: a lateral page of the latest posts per author."""
+        author = values(column("login", String()), name="author").data([(login,) for login in authors])
+        latest = (
+            select(Post.createdAt, Post.id, Post.author)
+            .where(Post.author == author.c.login)
+            .order_by(Post.createdAt.desc(), Post.id.desc())
+            .limit(self.backfill_size)
+            .lateral("latest")
+        )
+        rows = (
+            select(literal(owner_login), latest.c.createdAt, latest.c.id, latest.c.author)
+            .select_from(author)
+            .join(latest, true())
+            .where(author.c.login.not_in(select(HighFanoutAuthor.login)))
+        )
+        await self._insert_entries(rows)
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+
+    async def unfollow(self: Self, owner_login: str, author: str) -> None:
+        await self.unfollow_many(owner_login, [author])
+
+    async def unfollow_many(self: Self, owner_login: str, authors: Sequence[str]) -> None:
+        await self.repository.session.execute(
+            delete(TimelineEntry).where(
+                TimelineEntry.owner_login == owner_login,
+                TimelineEntry.author == any_(_logins_array(authors)),
+            ),
+        )
+        await self.repository._flush_or_commit(auto_commit=None)  # noqa: SLF001
+
+    async def list_home(
+        self: Self,
+        viewer_login: str,
+        *,
+        limit: int,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> list[PostView]:
+        """Return the page ``VisibilityService.list_friends_posts`` would, read from the materialized timeline.
+
+        Regular authors come from one range scan of the viewer's timeline; the few high-fanout
+        friends contribute a page each from the (author, createdAt, id) index.
+
+        Following an author backfills only their latest ``backfill_size`` posts, so the timeline is
+        complete down to that depth only. Pages that reach deeper, by offset or by a cursor that many
+        entries down the timeline, are read with ``list_friends_posts`` instead.
+        """
+        after = POST_KEYSET.decode(cursor) if cursor is not None else None
+        if after is not None:
+            offset = 0
+        depth = offset if after is None else await self._depth(viewer_login, after)
+        if depth + limit > self.backfill_size:
+            return await VisibilityService(session=self.repository.session).list_friends_posts(
+                viewer_login, limit=limit, offset=offset, cursor=cursor
+            )
+        high_fanout_logins = select(HighFanoutAuthor.login)
+
+        materialized = (
+            select(TimelineEntry.createdAt, TimelineEntry.post_id.label("id"))
+            .join(User, User.login == TimelineEntry.author)
+            .where(
+                TimelineEntry.owner_login == viewer_login,
+                TimelineEntry.author.not_in(high_fanout_logins),
+                VisibilityService.visible_to(viewer_login),
+            )
+            .order_by(TimelineEntry.createdAt.desc(), TimelineEntry.post_id.desc())
+            .limit(limit + offset)
+        )
+        if after is not None:
+            materialized = materialized.where(tuple_(TimelineEntry.createdAt, TimelineEntry.post_id) < tuple_(*after))
+
+        author_posts = (
+            select(Post.createdAt, Post.id)
+            .where(Post.author == Friend.login)
+            .order_by(Post.createdAt.desc(), Post.id.desc())
+            .limit(limit + offset)
+        )
+        if after is not None:
+            author_posts = author_posts.where(tuple_(Post.createdAt, Post.id) < tuple_(*after))
+        author_page = author_posts.lateral()
+        merged_on_read = (
+            select(author_page.c.createdAt, author_page.c.id)
+            .select_from(Friend)
+            .join(User, User.login == Friend.login)
+            .join(author_page, true())
+            .where(
+                Friend.of_login == viewer_login,
+                Friend.login.in_(high_fanout_logins),
+                VisibilityService.visible_to(viewer_login),
+            )
+        )
+
+        page = union_all(materialized, merged_on_read).subquery("page")
+        stmt = (
+            select(*post_view_columns())
+            .join(page, page.c.id == Post.id)
+            .order_by(page.c.createdAt.desc(), page.c.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [post_view(row) for row in await self.repository.session.execute(stmt)]
+
+    async def _depth(self: Self, viewer_login: str, after: Sequence[Any]) -> int:
+        """Count the viewer's timeline entries before the keyset position ``after``, up to ``backfill_size``."""
+        newer = (
+            select(TimelineEntry.post_id)
+            .where(
+                TimelineEntry.owner_login == viewer_login,
+                tuple_(TimelineEntry.createdAt, TimelineEntry.post_id) > tuple_(*after),
+            )
+            .limit(self.backfill_size)
+            .subquery()
+        )
+        return await self.repository.session.scalar(select(func.count()).select_from(newer)) or 0
+
+    async def _is_high_fanout(self: Self, author: str, max_followers: int) -> bool:
+        session = self.repository.session
+        if await session.scalar(select(exists().where(HighFanoutAuthor.login == author))):
+            return True
+        followers = select(Friend.of_login).where(Friend.login == author).limit(max_followers + 1).subquery()
+        if (await session.scalar(select(func.count()).select_from(followers)) or 0) <= max_followers:
+            return False
+        # The mark is sticky: an author hovering around the limit doesn't flip between read and write paths.
+        await session.execute(insert(HighFanoutAuthor).values(login=author).on_conflict_do_nothing())
+        return True
+
+    async def _insert_entries(self: Self, rows: Select[Any]) -> int:
+        stmt = (
+            insert(TimelineEntry)
+            .from_select(["owner_login", "createdAt", "post_id", "author"], rows)
+            .on_conflict_do_nothing()
+        )
+        result = await self.repository.session.execute(stmt)
+        return max(result.rowcount, 0)
+
+
+def _logins_array(logins: Sequence[str]) -> ColumnElement[list[str]]:
+    """``logins`` as one array parameter, so the statement is the same for any number of logins."""
+    return literal(list(logins), ARRAY(String(30)))
+
+
+def _session_partition_day(name: str) -> date | None:
+    if not name.startswith(SESSION_PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name.removeprefix(SESSION_PARTITION_PREFIX), "%Y%m%d").replace(tzinfo=UTC).date()
+    except ValueError:
+        return None
+
+
+def _post_table_columns() -> list[Any]:
+    # The generated search vector is only needed by full-text search, never carried through subqueries.
+    return [column_ for column_ in Post.__table__.c if column_.key != "search_vector"]
+
+
+def _author_posts(author: str, *, limit: int, offset: int, cursor: str | None) -> Select[Any]:
+    stmt = select(*post_view_columns()).where(Post.author == author)
+    for filter_ in POST_KEYSET.filters(limit=limit, offset=offset, cursor=cursor):
+        stmt = filter_.append_to_statement(stmt, Post)
+    return stmt
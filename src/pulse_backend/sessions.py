@@ -1,8 +1,26 @@
-from collections.abc import Sequence
+__all__ = (
+    "CODECS",
+    "HS256Codec",
+    "InvalidTokenError",
+    "JWTSessionAuthentication",
+    "JWTSessionAuthenticationMiddleware",
+    "JoseCodec",
+    "TokenCodec",
+    "auth",
+)
+
+import hashlib
+import hmac
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from os import getenv
-from typing import Any, Self
+from typing import Any, Protocol, Self, cast
+from uuid import UUID
 
+import msgspec
 from jose import jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 from litestar.config.app import AppConfig
@@ -14,9 +32,105 @@ from litestar.middleware.authentication import (
     AuthenticationResult,
 )
 from litestar.types import ASGIApp, Method, Scopes
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from pulse_backend.cache import session_cache, user_cache
 from pulse_backend.db_models import Session
-from pulse_backend.dependencies import provide_session_service
+from pulse_backend.dependencies import provide_session_service, provide_user_service
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenCodec(Protocol):
+    """Signs and verifies the claims of session tokens."""
+
+    def encode(self: Self, claims: dict[str, Any]) -> str: ...
+
+    def decode(self: Self, token: str) -> dict[str, Any]:
+        """Return the claims of ``token``.
+
+        Raise ``InvalidTokenError`` if the signature does not match, the token has expired or has no ``jti``.
+        """
+        ...
+
+
+@dataclass(slots=True)
+class JoseCodec:
+    """The generic ``python-jose`` implementation."""
+
+    secret: str
+
+    def encode(self: Self, claims: dict[str, Any]) -> str:
+        return jwt.encode(claims=claims, key=self.secret)
+
+    def decode(self: Self, token: str) -> dict[str, Any]:
+        try:
+            return jwt.decode(
+                token=token,
+                key=self.secret,
+                algorithms="HS256",
+                options={"require_jti": True, "require_exp": True},
+            )
+        except (JWTError, ExpiredSignatureError, JWTClaimsError) as e:
+            raise InvalidTokenError from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HS256Codec:
+    """HS256 only, compatible with ``JoseCodec``.
+
+    The HMAC key schedule is computed once and copied per token, tokens with the header this codec writes
+    skip header parsing, and only ``jti`` and ``exp`` are checked.
+    """
+
+    __slots__ = ("_mac",)
+
+    _header = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+    _decoder = msgspec.json.Decoder(dict[str, Any])
+    _encoder = msgspec.json.Encoder()
+
+    def __init__(self: Self, secret: str) -> None:
+        self._mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+    def encode(self: Self, claims: dict[str, Any]) -> str:
+        signing_input = self._header + b"." + _b64encode(self._encoder.encode(claims))
+        return (signing_input + b"." + self._sign(signing_input)).decode("ascii")
+
+    def decode(self: Self, token: str) -> dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if header != self._header and self._decoder.decode(_b64decode(header)).get("alg") != "HS256":
+                raise InvalidTokenError
+            if not hmac.compare_digest(self._sign(signing_input), signature):
+                raise InvalidTokenError
+            claims = self._decoder.decode(_b64decode(payload))
+        except (UnicodeError, ValueError, msgspec.DecodeError) as e:
+            raise InvalidTokenError from e
+
+        exp = claims.get("exp")
+        if not isinstance(claims.get("jti"), str) or not isinstance(exp, int | float) or isinstance(exp, bool):
+            raise InvalidTokenError
+        if exp < time.time():
+            raise InvalidTokenError
+        return claims
+
+    def _sign(self: Self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return _b64encode(mac.digest())
+
+
+CODECS: dict[str, Callable[[str], TokenCodec]] = {"hs256": HS256Codec, "jose": JoseCodec}
 
 
 class JWTSessionAuthenticationMiddleware(AbstractAuthenticationMiddleware):
@@ -27,7 +141,8 @@ class JWTSessionAuthenticationMiddleware(AbstractAuthenticationMiddleware):
         exclude_from_auth_key: str,
         exclude_http_methods: Sequence[Method],
         scopes: Scopes,
-        token_secret: str,
+        token_codec: TokenCodec,
+        stateless: bool,  # noqa: FBT001
     ) -> None:
         super().__init__(
             app=app,
@@ -36,7 +151,8 @@ class JWTSessionAuthenticationMiddleware(AbstractAuthenticationMiddleware):
             exclude_http_methods=exclude_http_methods,
             scopes=scopes,
         )
-        self.token_secret = token_secret
+        self.token_codec = token_codec
+        self.stateless = stateless
 
     async def authenticate_request(self: Self, connection: ASGIConnection[Any, Any, Any, Any]) -> AuthenticationResult:
         auth_header = connection.headers.get("Authorization")
@@ -48,29 +164,75 @@ class JWTSessionAuthenticationMiddleware(AbstractAuthenticationMiddleware):
             raise NotAuthorizedException(msg)
 
         try:
-            claims = jwt.decode(
-                token=auth_header[7:],
-                key=self.token_secret,
-                algorithms="HS256",
-                options={"require_jti": True, "require_exp": True},
-            )
-        except (JWTError, ExpiredSignatureError, JWTClaimsError) as e:
+            claims = self.token_codec.decode(auth_header[7:])
+        except InvalidTokenError as e:
             msg = "Invalid token"
             raise NotAuthorizedException(msg) from e
 
-        db_session = await connection.app.dependencies["db_session"](state=connection.app.state, scope=connection.scope)
-        session_service = await provide_session_service(db_session)
-        session = await session_service.get_one_or_none(id=claims["jti"])
+        if self.stateless:
+            return await self._authenticate_stateless(connection, claims)
+
+        session = session_cache.get(claims["jti"])
         if session is None:
+            db_session = await self._db_session(connection)
+            session_service = await provide_session_service(db_session)
+            session = await session_service.get_one_or_none(id=claims["jti"])
+            if session is None:
+                msg = "Invalid token"
+                raise NotAuthorizedException(msg)
+            # Detach the session so the cached copy is not expired by later commits.
+            db_session.expunge(session.user)
+            db_session.expunge(session)
+            session_cache.add(session)
+
+        return AuthenticationResult(user=session.user, auth=session)
+
+    async def _authenticate_stateless(
+        self: Self,
+        connection: ASGIConnection[Any, Any, Any, Any],
+        claims: dict[str, Any],
+    ) -> AuthenticationResult:
+        login, epoch = claims.get("sub"), claims.get("epoch")
+        if not isinstance(login, str) or not isinstance(epoch, int):
             msg = "Invalid token"
             raise NotAuthorizedException(msg)
 
-        return AuthenticationResult(user=session.user, auth=session)
+        user = user_cache.get(login)
+        if user is None:
+            db_session = await self._db_session(connection)
+            user_service = await provide_user_service(db_session)
+            user = await user_service.get_one_or_none(login=login)
+            if user is None:
+                msg = "Invalid token"
+                raise NotAuthorizedException(msg)
+            db_session.expunge(user)
+            user_cache.set(login, user)
+        # A token is revoked by bumping the user's epoch past the one it was issued with.
+        if user.session_epoch != epoch:
+            msg = "Invalid token"
+            raise NotAuthorizedException(msg)
+
+        session = Session(id=UUID(claims["jti"]), exp=datetime.fromtimestamp(claims["exp"], UTC), user_login=login)
+        return AuthenticationResult(user=user, auth=session)
+
+    async def _db_session(self: Self, connection: ASGIConnection[Any, Any, Any, Any]) -> AsyncSession:
+        # The SQLAlchemy plugin's provider, untyped in the app's dependencies.
+        session = await connection.app.dependencies["db_session"](state=connection.app.state, scope=connection.scope)
+        return cast("AsyncSession", session)
 
 
 @dataclass(slots=True)
 class JWTSessionAuthentication:
-    token_secret: str
+    """JWT bearer authentication.
+
+    By default a token names a ``Session`` row that must still exist. In ``stateless`` mode no session
+    rows are kept: a token carries the user's login and ``session_epoch``, and is valid while the epoch
+    is current. Epochs are read through ``user_cache``, so revocation reaches other workers via cache
+    invalidation or, at the latest, after ``USER_CACHE_TTL``.
+    """
+
+    token_codec: TokenCodec
+    stateless: bool = False
     exclude: str | list[str] | None = None
     exclude_from_auth_key: str = "exclude_from_auth"
     exclude_http_methods: Sequence[Method] | None = ("OPTIONS", "HEAD")
@@ -84,24 +246,30 @@ class JWTSessionAuthentication:
             exclude_from_auth_key=self.exclude_from_auth_key,
             exclude_http_methods=self.exclude_http_methods,
             scopes=self.scopes,
-            token_secret=self.token_secret,
+            token_codec=self.token_codec,
+            stateless=self.stateless,
         )
 
     def on_app_init(self: Self, app_config: AppConfig) -> AppConfig:
         app_config.middleware.insert(0, self.middleware)
         return app_config
 
-    def create_token(self: Self, session: Session) -> str:
-        return jwt.encode(claims={"jti": str(session.id), "exp": session.exp.timestamp()}, key=self.token_secret)
+    def create_token(self: Self, session: Session, session_epoch: int = 0) -> str:
+        claims: dict[str, Any] = {"jti": str(session.id), "exp": session.exp.timestamp()}
+        if self.stateless:
+            claims |= {"sub": session.user_login, "epoch": session_epoch}
+        return self.token_codec.encode(claims)
 
 
 auth = JWTSessionAuthentication(
-    token_secret=getenv("RANDOM_SECRET", "token"),
+    token_codec=CODECS[getenv("JWT_CODEC", "hs256")](getenv("RANDOM_SECRET", "token")),
+    stateless=getenv("AUTH_MODE") == "stateless",
     exclude=[
         "/schema",
         "/api/ping",
         "/api/countries",
         "/api/auth/register",
         "/api/auth/sign-in",
+        "/metrics",
     ],
 )
@@ -0,0 +1,99 @@
+__all__ = (
+    "PostBatchView",
+    "PostView",
+    "TagTrend",
+    "encode_post",
+    "encode_post_batch",
+    "encode_posts",
+    "encode_tag_trends",
+    "post_view",
+    "post_view_columns",
+)
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Self
+from uuid import UUID
+
+import msgspec
+from sqlalchemy import Row
+
+from pulse_backend.db_models import Post
+
+
+class PostView(msgspec.Struct, frozen=True, gc=False):
+    """A post as returned by the API, built straight from a row of ``post_view_columns`` by ``post_view``."""
+
+    id: UUID
+    content: str
+    author: str
+    tags: list[str]
+    createdAt: datetime  # noqa: N815
+    likesCount: int  # noqa: N815
+    dislikesCount: int  # noqa: N815
+
+    @classmethod
+    def from_post(cls: type[Self], post: Post) -> Self:
+        return cls(
+            id=post.id,
+            content=post.content,
+            author=post.author,
+            tags=post.tags,
+            createdAt=post.createdAt,
+            likesCount=post.likesTotal,
+            dislikesCount=post.dislikesTotal,
+        )
+
+
+class PostBatchView(msgspec.Struct, frozen=True, gc=False):
+    """Posts fetched by id, in the requested order, and the ids that could not be returned."""
+
+    posts: list[PostView]
+    notFound: list[UUID]  # noqa: N815
+    noAccess: list[UUID]  # noqa: N815
+
+
+class TagTrend(msgspec.Struct, frozen=True, gc=False):
+    """A trending tag: its posts in the window and their count decayed by age, which orders the tags."""
+
+    tag: str
+    score: float
+    posts: int
+
+
+def post_view_columns(entity: Any = Post) -> tuple[Any, ...]:  # noqa: ANN401
+    """Columns of ``entity`` (``Post`` or an alias of it) named after the ``PostView`` fields."""
+    return (
+        entity.id,
+        entity.content,
+        entity.author,
+        entity.tags,
+        entity.createdAt,
+        entity.likesTotal.label("likesCount"),
+        entity.dislikesTotal.label("dislikesCount"),
+    )
+
+
+def post_view(row: Row[Any]) -> PostView:
+    """Build a ``PostView`` from the ``post_view_columns`` of ``row``, which may hold other columns too."""
+    columns = row._mapping  # noqa: SLF001
+    return PostView(**{name: columns[name] for name in PostView.__struct_fields__})
+
+
+_encoder = msgspec.json.Encoder()
+
+
+def encode_post(post: PostView) -> bytes:
+    return _encoder.encode(post)
+
+
+def encode_posts(posts: Sequence[PostView]) -> bytes:
+    return _encoder.encode(posts)
+
+
+def encode_post_batch(batch: PostBatchView) -> bytes:
+    return _encoder.encode(batch)
+
+
+def encode_tag_trends(trends: Sequence[TagTrend]) -> bytes:
+    return _encoder.encode(trends)
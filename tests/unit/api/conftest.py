@@ -4,10 +4,17 @@ import pytest
 from litestar import Litestar
 from litestar.testing import AsyncTestClient
 
+from pulse_backend import query_audit
 from pulse_backend.app import create_app
 
 
-@pytest.fixture()
+@pytest.fixture(autouse=True)
+def strict_query_audit(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Fail any request over the query budget its handler declares.
+    monkeypatch.setattr(query_audit.audit, "mode", "strict")
+
+
+@pytest.fixture
 async def client() -> AsyncGenerator[AsyncTestClient[Litestar], None]:
     async with AsyncTestClient(create_app()) as client:
         yield client
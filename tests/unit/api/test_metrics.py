@@ -0,0 +1,13 @@
+from litestar import Litestar
+from litestar.status_codes import HTTP_200_OK
+from litestar.testing import AsyncTestClient
+
+
+async def test_metrics(client: AsyncTestClient[Litestar]) -> None:
+    await client.get("/api/ping")
+    response = await client.get("/metrics")
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'pulse_http_responses_total{method="GET",route="/api/ping",status="200"}' in response.text
+    assert 'pulse_http_request_db_statements_count{method="GET",route="/api/ping"}' in response.text
+    assert 'pulse_cache_hits_total{cache="session"}' in response.text
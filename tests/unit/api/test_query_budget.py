@@ -0,0 +1,70 @@
+from collections.abc import AsyncGenerator, Iterator
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from litestar import Litestar
+from litestar.status_codes import HTTP_200_OK, HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.testing import AsyncTestClient
+from sqlalchemy import Engine, StaticPool, create_engine, text
+
+from pulse_backend import sessions
+from pulse_backend.app import create_app
+from pulse_backend.background import TrendingTags
+from pulse_backend.cache import user_cache
+from pulse_backend.db_models import Session, User
+from pulse_backend.services import PostService
+
+TRENDING_BUDGET = 5
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+async def client(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[AsyncTestClient[Litestar], None]:
+    # Stateless tokens of a cached user authenticate without a database.
+    monkeypatch.setattr(sessions.auth, "stateless", True)
+    user_cache.set("alice", User(login="alice", session_epoch=0))
+    session = Session(id=uuid4(), exp=datetime.now(UTC) + timedelta(hours=1), user_login="alice")
+    async with AsyncTestClient(create_app()) as client:
+        client.headers["Authorization"] = f"Bearer {sessions.auth.create_token(session)}"
+        yield client
+    user_cache.invalidate("alice")
+
+
+def refresh_with(engine: Engine, statements: int) -> TrendingTags:
+    class Refresh(TrendingTags):
+        async def refresh(self, post_service: PostService) -> None:  # noqa: ARG002
+            with engine.connect() as conn:
+                for _ in range(statements):
+                    conn.execute(text("SELECT 1"))
+            self._top = {}
+            self._refreshed_at = 0
+
+    return Refresh(max_age=float("inf"))
+
+
+async def test_trending_within_budget(
+    client: AsyncTestClient[Litestar], engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("pulse_backend.api.posts.trending_tags", refresh_with(engine, TRENDING_BUDGET))
+    response = await client.get("/api/posts/trending")
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == []
+
+
+async def test_trending_over_budget_fails(
+    client: AsyncTestClient[Litestar], engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("pulse_backend.api.posts.trending_tags", refresh_with(engine, TRENDING_BUDGET + 1))
+    response = await client.get("/api/posts/trending")
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.text == (
+        f"Query budget exceeded: GET /api/posts/trending executed {TRENDING_BUDGET + 1} queries,"
+        f" its budget is {TRENDING_BUDGET}"
+    )
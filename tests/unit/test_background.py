@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Mapping, Sequence
+from datetime import UTC, datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from pulse_backend import background
+from pulse_backend.background import TimelineFanOut, TrendingTags
+from pulse_backend.db_models import Post
+from pulse_backend.services import TRENDING_WINDOWS, TrendingWindow
+from pulse_backend.views import TagTrend
+
+
+class FakeTimelineService:
+    batches: list[list[Post]]
+
+    def __init__(self, session: object, auto_commit: bool) -> None:  # noqa: FBT001
+        pass
+
+    async def fan_out(self, posts: Sequence[Post], max_followers: int) -> int:  # noqa: ARG002
+        self.batches.append(list(posts))
+        return len(posts)
+
+
+@contextlib.asynccontextmanager
+async def fake_session() -> AsyncIterator[None]:
+    yield None
+
+
+def make_post() -> Post:
+    return Post(id=uuid4(), content="", author="author", tags=[], createdAt=datetime.now(UTC))
+
+
+def test_disabled_fanout_ignores_posts() -> None:
+    async def run() -> None:
+        fanout = TimelineFanOut(enabled=False, max_followers=10)
+        fanout.start(fake_session)  # type: ignore[arg-type]
+        fanout.submit(make_post())
+        await fanout.stop()
+
+    asyncio.run(run())
+
+
+def test_fanout_batches_queued_posts(monkeypatch: pytest.MonkeyPatch) -> None:
+    batches: list[list[Post]] = []
+    monkeypatch.setattr(FakeTimelineService, "batches", batches, raising=False)
+    monkeypatch.setattr(background, "TimelineService", FakeTimelineService)
+
+    async def run() -> None:
+        fanout = TimelineFanOut(enabled=True, max_followers=10, batch_size=2)
+        fanout.start(fake_session)  # type: ignore[arg-type]
+        posts = [make_post() for _ in range(3)]
+        for post in posts:
+            fanout.submit(post)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await fanout.stop()
+        assert batches == [posts[:2], posts[2:]]
+
+    asyncio.run(run())
+
+
+class FakeTrendingPostService:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.added: list[dict[tuple[datetime, str], int]] = []
+        self.queries = 0
+
+    async def add_tag_counts(self, counts: Mapping[tuple[datetime, str], int]) -> None:
+        if self.fail:
+            raise RuntimeError
+        self.added.append(dict(counts))
+
+    async def prune_tag_buckets(self, now: datetime) -> None:
+        pass
+
+    async def trending_tags(self, window: TrendingWindow, now: datetime, limit: int) -> list[TagTrend]:  # noqa: ARG002
+        self.queries += 1
+        await asyncio.sleep(0)
+        return [TagTrend(tag=f"tag{i}", score=float(limit - i), posts=limit - i) for i in range(limit)]
+
+
+def test_trending_tags_counts_posts_per_minute_and_tag() -> None:
+    trending = TrendingTags(max_age=30, limit=3)
+    created_at = datetime(2026, 10, 18, 13, 14, 15, tzinfo=timezone(timedelta(hours=2)))
+    trending.record(["stocks", "stocks", "bonds"], created_at)
+    trending.record(["stocks"], created_at + timedelta(seconds=30))
+    trending.record(["stocks"], created_at + timedelta(minutes=1))
+    service = FakeTrendingPostService()
+    assert trending.top("1h", 3) is None
+
+    asyncio.run(trending.refresh(service))  # type: ignore[arg-type]
+
+    minute = datetime(2026, 10, 18, 11, 14, tzinfo=UTC)
+    assert service.added == [
+        {(minute, "stocks"): 2, (minute, "bonds"): 1, (minute + timedelta(minutes=1), "stocks"): 1},
+    ]
+    assert [trend.tag for trend in trending.top("24h", 2) or []] == ["tag0", "tag1"]
+
+
+def test_trending_tags_keeps_counts_that_could_not_be_added() -> None:
+    trending = TrendingTags(max_age=30)
+    trending.record(["stocks"], datetime.now(UTC))
+    with pytest.raises(RuntimeError):
+        asyncio.run(trending.refresh(FakeTrendingPostService(fail=True)))  # type: ignore[arg-type]
+    assert trending.top("1h", 10) is None
+
+    service = FakeTrendingPostService()
+    asyncio.run(trending.refresh(service))  # type: ignore[arg-type]
+    assert [set(added.values()) for added in service.added] == [{1}]
+
+
+def test_concurrent_trending_refreshes_query_once() -> None:
+    trending = TrendingTags(max_age=30)
+    service = FakeTrendingPostService()
+
+    async def run() -> None:
+        await asyncio.gather(*(trending.refresh(service) for _ in range(3)))  # type: ignore[arg-type]
+
+    asyncio.run(run())
+    assert service.queries == len(TRENDING_WINDOWS)
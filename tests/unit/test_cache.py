@@ -0,0 +1,88 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from pulse_backend.cache import Audience, SessionCache, TTLCache, VisibilityCache
+from pulse_backend.db_models import Session
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3  # noqa: PLR2004
+
+
+def test_expiry() -> None:
+    timer = FakeTimer()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, timer=timer)
+    cache.set("a", 1, expires_at=timer.now + 10)
+    assert cache.get("a") == 1
+    timer.now += 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_session_cache_invalidate_user() -> None:
+    cache = SessionCache(maxsize=10)
+    exp = datetime.now(UTC) + timedelta(hours=1)
+    first = Session(id=uuid4(), exp=exp, user_login="alice")
+    second = Session(id=uuid4(), exp=exp, user_login="alice")
+    other = Session(id=uuid4(), exp=exp, user_login="bob")
+    for session in (first, second, other):
+        cache.add(session)
+
+    cache.invalidate_user("alice")
+
+    assert cache.get(str(first.id)) is None
+    assert cache.get(str(second.id)) is None
+    assert cache.get(str(other.id)) is other
+
+
+def test_session_cache_skips_expired() -> None:
+    cache = SessionCache(maxsize=10)
+    session = Session(id=uuid4(), exp=datetime.now(UTC) - timedelta(seconds=1), user_login="alice")
+    cache.add(session)
+    assert len(cache) == 0
+
+
+def test_audience_allows() -> None:
+    private = Audience(is_public=False, friends=frozenset({"friend"}))
+    assert private.allows("author", "author")
+    assert private.allows("author", "friend")
+    assert not private.allows("author", "stranger")
+    assert Audience(is_public=True, friends=frozenset()).allows("author", "stranger")
+
+
+def test_visibility_cache_bounds_friend_logins() -> None:
+    cache = VisibilityCache(maxsize=10, max_logins=3, ttl=60)
+    cache.add("a", Audience(is_public=False, friends=frozenset({"x", "y"})))
+    cache.add("b", Audience(is_public=False, friends=frozenset({"z"})))
+    assert cache.logins == 3  # noqa: PLR2004
+    cache.add("c", Audience(is_public=True, friends=frozenset({"w"})))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.logins == 2  # noqa: PLR2004
+    cache.add("d", Audience(is_public=True, friends=frozenset({"1", "2", "3", "4"})))
+    assert cache.get("d") is None
+
+
+def test_visibility_cache_invalidate() -> None:
+    cache = VisibilityCache(maxsize=10, max_logins=10, ttl=60)
+    cache.add("a", Audience(is_public=False, friends=frozenset({"x"})))
+    cache.add("a", Audience(is_public=False, friends=frozenset({"x", "y"})))
+    assert cache.logins == 2  # noqa: PLR2004
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.logins == 0
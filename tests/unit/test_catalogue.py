@@ -0,0 +1,37 @@
+import json
+
+from pulse_backend.catalogue import CountryRecord, CountrySnapshot
+from pulse_backend.schemas import CountryRegion
+
+COUNTRIES = (
+    CountryRecord(name="Russian Federation", alpha2="RU", alpha3="RUS", region="Europe"),
+    CountryRecord(name="Antarctica", alpha2="AQ", alpha3="ATA", region=""),
+    CountryRecord(name="Afghanistan", alpha2="AF", alpha3="AFG", region="Asia"),
+    CountryRecord(name="Albania", alpha2="AL", alpha3="ALB", region="Europe"),
+)
+
+
+def test_lookup() -> None:
+    snapshot = CountrySnapshot.build(COUNTRIES)
+    assert snapshot.exists("RU") is True
+    assert snapshot.exists("ru") is False
+    assert json.loads(snapshot.encoded_by_alpha2["AL"]) == {
+        "name": "Albania",
+        "alpha2": "AL",
+        "alpha3": "ALB",
+        "region": "Europe",
+    }
+
+
+def test_encoded_list_is_sorted_by_alpha2() -> None:
+    snapshot = CountrySnapshot.build(COUNTRIES)
+    assert [c["alpha2"] for c in json.loads(snapshot.encoded_list(None))] == ["AF", "AL", "AQ", "RU"]
+
+
+def test_encoded_list_by_regions() -> None:
+    snapshot = CountrySnapshot.build(COUNTRIES)
+    europe = json.loads(snapshot.encoded_list([CountryRegion.EUROPE]))
+    assert [c["alpha2"] for c in europe] == ["AL", "RU"]
+    europe_asia = json.loads(snapshot.encoded_list([CountryRegion.EUROPE, CountryRegion.ASIA, CountryRegion.EUROPE]))
+    assert [c["alpha2"] for c in europe_asia] == ["AF", "AL", "RU"]
+    assert json.loads(snapshot.encoded_list([CountryRegion.OCEANIA])) == []
@@ -1,3 +1,5 @@
+import asyncio
+
 from pulse_backend import crypt
 
 
@@ -9,3 +11,25 @@ def test_valid() -> None:
 def test_invalid() -> None:
     hashed_password = crypt.hash_password("password123")
     assert crypt.check_password("invalidpassword5", hashed_password) is False
+
+
+async def test_async_valid() -> None:
+    hashed_password = await crypt.hash_password_async("password123")
+    assert await crypt.check_password_async("password123", hashed_password) is True
+
+
+async def test_async_invalid() -> None:
+    hashed_password = await crypt.hash_password_async("password123")
+    assert await crypt.check_password_async("invalidpassword5", hashed_password) is False
+
+
+async def test_hasher_stats() -> None:
+    hasher = crypt.PasswordHasher(max_workers=1)
+    hashed_password = crypt.hash_password("password123")
+    await asyncio.gather(*(hasher.check_password("password123", hashed_password) for _ in range(3)))
+    stats = hasher.stats()
+    assert stats.in_flight == 0
+    assert stats.queue_depth == 0
+    assert stats.max_queue_depth == 2  # noqa: PLR2004
+    assert stats.completed == 3  # noqa: PLR2004
+    hasher.shutdown()
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from pulse_backend.cache import Audience, session_cache, visibility_cache
+from pulse_backend.catalogue import CountryRecord, CountrySnapshot, country_catalogue
+from pulse_backend.db_models import Session
+from pulse_backend.invalidation import CHANNEL, InvalidationListener, listener, publish
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, stmt: object) -> None:
+        compiled = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})  # type: ignore[attr-defined]
+        self.statements.append(str(compiled))
+
+
+def test_publish_notifies_channel() -> None:
+    session = RecordingSession()
+    asyncio.run(publish(session, "audience", "alice"))  # type: ignore[arg-type]
+    assert session.statements == [f"SELECT pg_notify('{CHANNEL}', 'audience:alice') AS pg_notify_1"]
+
+
+def test_publish_is_skipped_without_listener(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(listener, "enabled", False)
+    session = RecordingSession()
+    asyncio.run(publish(session, "audience", "alice"))  # type: ignore[arg-type]
+    assert session.statements == []
+
+
+def test_notifications_evict_local_caches() -> None:
+    listener = InvalidationListener(enabled=False)
+    session = Session(id=uuid4(), user_login="alice", exp=datetime.now(UTC) + timedelta(hours=1))
+    session_cache.add(session)
+    visibility_cache.add("alice", Audience(is_public=True, friends=frozenset()))
+
+    listener._on_notification(None, 0, CHANNEL, "audience:alice")  # noqa: SLF001
+    assert visibility_cache.get("alice") is None
+    assert session_cache.get(str(session.id)) is not None
+
+    listener._on_notification(None, 0, CHANNEL, "sessions:alice")  # noqa: SLF001
+    assert session_cache.get(str(session.id)) is None
+
+    listener._on_notification(None, 0, CHANNEL, "unknown:alice")  # noqa: SLF001
+
+
+def test_countries_notification_reloads_the_catalogue() -> None:
+    class CountryService:
+        async def list(self) -> list[CountryRecord]:
+            return [CountryRecord(name="Netherlands", alpha2="NL", alpha3="NLD", region="Europe")]
+
+    listener = InvalidationListener(enabled=False)
+    country_catalogue._snapshot = CountrySnapshot.build([])  # noqa: SLF001
+    assert not asyncio.run(country_catalogue.get(CountryService())).exists("NL")  # type: ignore[arg-type]
+
+    listener._on_notification(None, 0, CHANNEL, "countries:")  # noqa: SLF001
+    assert asyncio.run(country_catalogue.get(CountryService())).exists("NL")  # type: ignore[arg-type]
+    country_catalogue.clear()
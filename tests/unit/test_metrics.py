@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, text
+
+from pulse_backend.metrics import HistogramFamily, RequestStats, _request_stats, instrument_sql, metrics, render_samples
+
+
+def test_histogram_render() -> None:
+    family = HistogramFamily("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    family.labels('/a"b').observe(0.1)
+    family.labels('/a"b').observe(0.5)
+    family.labels('/a"b').observe(5)
+    lines: list[str] = []
+    family.render(lines)
+    assert lines == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a\\"b"} 5.6',
+        'latency_seconds_count{route="/a\\"b"} 3',
+    ]
+
+
+def test_render_samples() -> None:
+    lines: list[str] = []
+    render_samples(lines, "up", "gauge", "Up.", [({}, 1), ({"state": "x"}, 0.5)])
+    assert lines == ["# HELP up Up.", "# TYPE up gauge", "up 1", 'up{state="x"} 0.5']
+
+
+def test_statements_are_counted_per_request() -> None:
+    instrument_sql()
+    engine = create_engine("sqlite://")
+    total = metrics.db_statements
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        _request_stats.reset(token)
+    assert stats.statements == 2  # noqa: PLR2004
+    assert metrics.db_statements == total + 2
@@ -0,0 +1,63 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from litestar.exceptions import ValidationException
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from pulse_backend.db_models import Friend, Post
+from pulse_backend.pagination import FRIEND_KEYSET, POST_KEYSET, SEARCH_KEYSET, KeysetPagination
+
+
+def test_cursor_roundtrip() -> None:
+    values = [datetime.now(UTC), uuid4()]
+    assert POST_KEYSET.decode(POST_KEYSET.encode(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", FRIEND_KEYSET.encode([datetime.now(UTC), "login"])])
+def test_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(ValidationException):
+        POST_KEYSET.decode(cursor)
+
+
+def test_next_cursor_only_for_full_pages() -> None:
+    post = Post(id=uuid4(), createdAt=datetime.now(UTC))
+    assert POST_KEYSET.next_cursor([post], limit=2) is None
+    cursor = POST_KEYSET.next_cursor([post], limit=1)
+    assert cursor is not None
+    assert POST_KEYSET.decode(cursor) == [post.createdAt, post.id]
+
+
+def test_row_comparison_for_uniform_order() -> None:
+    keyset_filter = KeysetPagination(
+        order_by=[("createdAt", "desc"), ("id", "desc")],
+        after=[datetime.now(UTC), uuid4()],
+        limit=5,
+    )
+    sql = str(keyset_filter.append_to_statement(select(Post), Post).compile(dialect=postgresql.dialect()))
+    assert '(post."createdAt", post.id) <' in sql
+    assert 'ORDER BY post."createdAt" DESC, post.id DESC' in sql
+
+
+def test_expanded_comparison_for_mixed_order() -> None:
+    keyset_filter = KeysetPagination(
+        order_by=[("addedAt", "desc"), ("login", "asc")],
+        after=[datetime.now(UTC), "login"],
+        limit=5,
+    )
+    sql = str(keyset_filter.append_to_statement(select(Friend), Friend).compile(dialect=postgresql.dialect()))
+    assert 'friend."addedAt" <=' in sql
+    assert "friend.login >" in sql
+    assert 'ORDER BY friend."addedAt" DESC, friend.login ASC' in sql
+
+
+def test_search_keyset_over_subquery_columns() -> None:
+    cursor = SEARCH_KEYSET.encode([0.1, datetime.now(UTC), uuid4()])
+    matches = select(Post.id, Post.createdAt, func.ts_rank_cd(Post.search_vector, "q").label("rank")).subquery()
+    stmt = select(matches)
+    for filter_ in SEARCH_KEYSET.filters(limit=5, offset=0, cursor=cursor):
+        stmt = filter_.append_to_statement(stmt, matches.c)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert '(anon_1.rank, anon_1."createdAt", anon_1.id) <' in sql
+    assert 'ORDER BY anon_1.rank DESC, anon_1."createdAt" DESC, anon_1.id DESC' in sql
@@ -0,0 +1,55 @@
+from collections.abc import Iterator
+
+import pytest
+from litestar import Litestar, get
+from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.testing import TestClient
+from sqlalchemy import Engine, StaticPool, create_engine, text
+
+from pulse_backend.query_audit import QueryAudit, logger
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    # The test client serves requests from another thread.
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+def create_app(audit: QueryAudit, engine: Engine) -> Litestar:
+    @get("/items", opt={"query_budget": 2}, sync_to_thread=False)
+    def list_items(count: int) -> int:
+        with engine.connect() as conn:
+            for item in range(count):
+                conn.execute(text("SELECT :item"), {"item": item})
+        return count
+
+    return Litestar(route_handlers=(list_items,), on_app_init=(audit.on_app_init,))
+
+
+def test_within_budget(engine: Engine) -> None:
+    with TestClient(create_app(QueryAudit(mode="strict"), engine)) as client:
+        assert client.get("/items", params={"count": 2}).json() == 2  # noqa: PLR2004
+
+
+def test_over_budget_fails_in_strict_mode(engine: Engine) -> None:
+    with TestClient(create_app(QueryAudit(mode="strict"), engine)) as client:
+        response = client.get("/items", params={"count": 3})
+    assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.text == "Query budget exceeded: GET /items executed 3 queries, its budget is 2"
+
+
+def test_repeated_and_slow_statements_are_logged(engine: Engine, caplog: pytest.LogCaptureFixture) -> None:
+    audit = QueryAudit(mode="warn", slow_threshold=0, repeat_threshold=3)
+    # The app's logging config replaces the root handlers that caplog relies on.
+    logger.addHandler(caplog.handler)
+    try:
+        with TestClient(create_app(audit, engine)) as client:
+            client.get("/items", params={"count": 3})
+    finally:
+        logger.removeHandler(caplog.handler)
+    messages = [record.getMessage() for record in caplog.records]
+    assert "Possible N+1 in GET /items, executed 3 times: SELECT ?" in messages
+    assert "GET /items executed 3 queries, its budget is 2" in messages
+    assert any(message.startswith("Slow query") for message in messages)
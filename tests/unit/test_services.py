@@ -0,0 +1,185 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, insert, select, text
+from sqlalchemy.orm import Session as OrmSession
+
+from pulse_backend.crypt import hash_password
+from pulse_backend.db_models import Base, Post, PostCounterShard, Reaction, Session, TimelineEntry, User
+from pulse_backend.pagination import POST_KEYSET
+from pulse_backend.services import PostService, SessionService, TimelineService, UserService, VisibilityService
+from pulse_backend.views import PostView
+
+OLD_PASSWORD = "Old12345"  # noqa: S105
+NEW_PASSWORD = "New12345"  # noqa: S105
+
+
+class SyncSessionAdapter:
+    """The part of ``AsyncSession`` the services below use, over a synchronous session."""
+
+    def __init__(self, session: OrmSession) -> None:
+        self.session = session
+        self.bind = session.bind
+        self.info = session.info
+
+    def get_bind(self) -> Any:  # noqa: ANN401
+        return self.session.get_bind()
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        return self.session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        return self.session.scalar(statement, *args, **kwargs)
+
+    async def flush(self) -> None:
+        self.session.flush()
+
+    async def commit(self) -> None:
+        self.session.commit()
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: Any, _: Any) -> None:  # noqa: ANN401
+        # Stands in for the NOTIFY of the cache invalidation.
+        dbapi_connection.create_function("pg_notify", 2, lambda *_: None)
+
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            User.__table__,
+            Session.__table__,
+            Reaction.__table__,
+            PostCounterShard.__table__,
+            TimelineEntry.__table__,
+        ],
+    )
+    # "post" without the Postgres-only tags array and search vector.
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                'CREATE TABLE post (id BLOB PRIMARY KEY, content TEXT, author TEXT, tags TEXT, "createdAt" TIMESTAMP,'
+                ' "likesCount" INTEGER, "dislikesCount" INTEGER)'
+            )
+        )
+    yield engine
+    engine.dispose()
+
+
+def test_password_change_keeps_the_session_epoch_bump(engine: Engine) -> None:
+    with OrmSession(engine) as session:
+        session.add(
+            User(
+                login="alice",
+                email="alice@example.com",
+                hashed_password=hash_password(OLD_PASSWORD),
+                country_code="NL",
+                is_public=True,
+            )
+        )
+        session.commit()
+        request_user = session.scalar(select(User))
+        session.expunge_all()
+
+    async def change_password() -> None:
+        with OrmSession(engine) as session:
+            adapter = SyncSessionAdapter(session)
+            await SessionService(session=adapter, auto_commit=True).deactivate("alice")  # type: ignore[arg-type]
+            await UserService(session=adapter, auto_commit=True).update_password(  # type: ignore[arg-type]
+                request_user, old_password=OLD_PASSWORD, new_password=NEW_PASSWORD
+            )
+
+    asyncio.run(change_password())
+
+    with OrmSession(engine) as session:
+        user = session.scalars(select(User)).one()
+        assert user.session_epoch == 1
+        assert user.hashed_password == request_user.hashed_password != b""
+
+
+@pytest.mark.parametrize(
+    ("reactions", "likes", "dislikes"),
+    [
+        ([True], 1, 0),
+        ([True, True], 1, 0),
+        ([True, False], 0, 1),
+        ([False, True, True, False], 0, 1),
+    ],
+)
+def test_reactions_count_once_per_user(engine: Engine, reactions: list[bool], likes: int, dislikes: int) -> None:
+    post_id = uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Post.__table__).values(
+                id=post_id, content="", author="alice", createdAt=datetime.now(UTC), likesCount=0, dislikesCount=0
+            )
+        )
+
+    async def react() -> PostView:
+        with OrmSession(engine) as session:
+            post_service = PostService(session=SyncSessionAdapter(session), auto_commit=True)  # type: ignore[arg-type]
+            for is_like in reactions:
+                post = await post_service.react(post_id, "bob", is_like=is_like)
+            return post
+
+    post = asyncio.run(react())
+    assert (post.likesCount, post.dislikesCount) == (likes, dislikes)
+    with OrmSession(engine) as session:
+        assert session.scalars(select(Reaction.is_like)).all() == [reactions[-1]]
+
+
+@pytest.mark.parametrize("by_cursor", [False, True])
+def test_home_pages_past_the_backfill_are_read_from_friends_posts(
+    engine: Engine,
+    monkeypatch: pytest.MonkeyPatch,
+    by_cursor: bool,  # noqa: FBT001
+) -> None:
+    now = datetime.now(UTC)
+    entries = [(now - timedelta(minutes=minutes), uuid4()) for minutes in range(TimelineService.backfill_size)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(TimelineEntry.__table__),
+            [
+                {"owner_login": "alice", "createdAt": created_at, "post_id": post_id, "author": "bob"}
+                for created_at, post_id in entries
+            ],
+        )
+    friends_posts = [
+        PostView(
+            id=uuid4(),
+            content="",
+            author="bob",
+            tags=[],
+            createdAt=now - timedelta(days=1),
+            likesCount=0,
+            dislikesCount=0,
+        )
+    ]
+    calls: list[tuple[str, int, int, str | None]] = []
+
+    async def list_friends_posts(
+        _: VisibilityService, viewer_login: str, *, limit: int, offset: int, cursor: str | None = None
+    ) -> list[PostView]:
+        calls.append((viewer_login, limit, offset, cursor))
+        return friends_posts
+
+    monkeypatch.setattr(VisibilityService, "list_friends_posts", list_friends_posts)
+    # The next page starts 5 entries before the end of the backfill.
+    depth = TimelineService.backfill_size - 5
+    cursor = POST_KEYSET.encode(entries[depth - 1]) if by_cursor else None
+    offset = 0 if by_cursor else depth
+
+    async def list_home() -> list[PostView]:
+        with OrmSession(engine) as session:
+            timeline_service = TimelineService(session=SyncSessionAdapter(session))  # type: ignore[arg-type]
+            return await timeline_service.list_home("alice", limit=10, offset=offset, cursor=cursor)
+
+    assert asyncio.run(list_home()) == friends_posts
+    assert calls == [("alice", 10, offset, cursor)]
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from litestar.exceptions import NotAuthorizedException
+from litestar.middleware.authentication import AuthenticationResult
+
+from pulse_backend.cache import user_cache
+from pulse_backend.db_models import Session, User
+from pulse_backend.sessions import (
+    HS256Codec,
+    InvalidTokenError,
+    JoseCodec,
+    JWTSessionAuthentication,
+    JWTSessionAuthenticationMiddleware,
+)
+
+
+class FakeConnection:
+    def __init__(self, token: str) -> None:
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+def authenticate(auth: JWTSessionAuthentication, token: str) -> AuthenticationResult:
+    middleware = JWTSessionAuthenticationMiddleware(
+        app=None,  # type: ignore[arg-type]
+        exclude=auth.exclude,
+        exclude_from_auth_key=auth.exclude_from_auth_key,
+        exclude_http_methods=auth.exclude_http_methods,
+        scopes=auth.scopes,
+        token_codec=auth.token_codec,
+        stateless=auth.stateless,
+    )
+    return asyncio.run(middleware.authenticate_request(FakeConnection(token)))  # type: ignore[arg-type]
+
+
+def make_token(auth: JWTSessionAuthentication, epoch: int) -> tuple[Session, str]:
+    session = Session(id=uuid4(), exp=datetime.now(UTC) + timedelta(hours=1), user_login="alice")
+    return session, auth.create_token(session, session_epoch=epoch)
+
+
+def test_stateless_token_authenticates_from_cached_user() -> None:
+    auth = JWTSessionAuthentication(token_codec=HS256Codec("secret"), stateless=True)
+    user = User(login="alice", session_epoch=3)
+    user_cache.set("alice", user)
+    session, token = make_token(auth, epoch=3)
+
+    result = authenticate(auth, token)
+    assert result.user is user
+    assert result.auth.id == session.id
+    assert result.auth.user_login == "alice"
+    user_cache.invalidate("alice")
+
+
+def test_stateless_token_is_revoked_by_epoch() -> None:
+    auth = JWTSessionAuthentication(token_codec=HS256Codec("secret"), stateless=True)
+    user_cache.set("alice", User(login="alice", session_epoch=4))
+    _, token = make_token(auth, epoch=3)
+
+    with pytest.raises(NotAuthorizedException):
+        authenticate(auth, token)
+    user_cache.invalidate("alice")
+
+
+def test_session_token_is_not_accepted_as_stateless() -> None:
+    _, token = make_token(JWTSessionAuthentication(token_codec=HS256Codec("secret")), epoch=0)
+    with pytest.raises(NotAuthorizedException):
+        authenticate(JWTSessionAuthentication(token_codec=HS256Codec("secret"), stateless=True), token)
+
+
+def claims(exp: timedelta = timedelta(hours=1)) -> dict[str, object]:
+    return {"jti": str(uuid4()), "exp": (datetime.now(UTC) + exp).timestamp()}
+
+
+def test_hs256_codec_is_compatible_with_jose() -> None:
+    fast, jose = HS256Codec("secret"), JoseCodec("secret")
+    token_claims = claims()
+    assert fast.decode(jose.encode(token_claims)) == token_claims
+    assert jose.decode(fast.encode(token_claims)) == token_claims
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        HS256Codec("other").encode(claims()),
+        HS256Codec("secret").encode(claims(exp=-timedelta(seconds=1))),
+        HS256Codec("secret").encode({"exp": claims()["exp"]}),
+        HS256Codec("secret").encode({"jti": "id"}),
+        JoseCodec("secret").encode(claims())[:-2],
+        "not.a.token",
+        "",
+    ],
+)
+def test_hs256_codec_rejects_invalid_tokens(token: str) -> None:
+    with pytest.raises(InvalidTokenError):
+        HS256Codec("secret").decode(token)
+
+
+def test_hs256_codec_rejects_other_algorithms() -> None:
+    token = JoseCodec("secret").encode(claims())
+    _, payload, signature = token.split(".")
+    none_header = "eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0"  # {"alg":"none","typ":"JWT"}
+    with pytest.raises(InvalidTokenError):
+        HS256Codec("secret").decode(f"{none_header}.{payload}.{signature}")
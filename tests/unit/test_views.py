@@ -0,0 +1,59 @@
+import json
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from pulse_backend.db_models import Post
+from pulse_backend.views import PostBatchView, PostView, encode_post, encode_post_batch, encode_posts
+
+
+def make_view() -> PostView:
+    return PostView(
+        id=uuid4(),
+        content="hello",
+        author="author",
+        tags=["a", "b"],
+        createdAt=datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+        likesCount=1,
+        dislikesCount=2,
+    )
+
+
+def test_encode_post() -> None:
+    view = make_view()
+    assert json.loads(encode_post(view)) == {
+        "id": str(view.id),
+        "content": "hello",
+        "author": "author",
+        "tags": ["a", "b"],
+        "createdAt": "2026-01-02T03:04:05.000006Z",
+        "likesCount": 1,
+        "dislikesCount": 2,
+    }
+
+
+def test_encode_posts() -> None:
+    views = [make_view(), make_view()]
+    assert [post["id"] for post in json.loads(encode_posts(views))] == [str(view.id) for view in views]
+    assert json.loads(encode_posts([])) == []
+
+
+def test_from_post() -> None:
+    view = make_view()
+    post = Post(
+        id=view.id,
+        content=view.content,
+        author=view.author,
+        tags=view.tags,
+        createdAt=view.createdAt,
+    )
+    post.likesTotal = view.likesCount
+    post.dislikesTotal = view.dislikesCount
+    assert PostView.from_post(post) == view
+
+
+def test_encode_post_batch() -> None:
+    view, missing, hidden = make_view(), uuid4(), uuid4()
+    batch = json.loads(encode_post_batch(PostBatchView(posts=[view], notFound=[missing], noAccess=[hidden])))
+    assert [post["id"] for post in batch["posts"]] == [str(view.id)]
+    assert batch["notFound"] == [str(missing)]
+    assert batch["noAccess"] == [str(hidden)]